@@ -0,0 +1,188 @@
+"""Benchmark of loading, rule induction and renaming of rules for tools.py and numpy_tools.py.
+
+Synthetic systems from generator.py are measured on grid of sizes. Every measurement has best wall time of repeats,
+peak memory (tracemalloc, in separate run so it doesn't slow timed runs) and number of rules. Results are saved as
+JSON, so results of two commits can be compared (--baseline prints ratio of times). Compiled kernels (reader module
+built by setup.py) are used when they are built, --python-kernels measures pure Python functions instead, so two runs
+show speed-up of kernels.
+
+Grid is given by --rows and --attributes or by name of GRIDS, large grid shows where compiled kernels stop paying off.
+
+Example:
+    python benchmark.py --rows 200 1000 --attributes 4 6 --output bench.json
+    python benchmark.py --grid large --algorithms covering --backends python --repeat 1
+    python benchmark.py --python-kernels --output python.json && python benchmark.py --baseline python.json
+"""
+import argparse
+import copy
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import generator
+import tools
+
+ALGORITHMS = ('covering', 'exhaustive', 'lem2')
+BACKENDS = ('python', 'numpy')
+GRIDS = {'small': ([100, 500], [4, 6]), 'large': ([1000, 5000, 20000, 40000], [8])}  # name -> (rows, attributes)
+
+
+def measure(function, repeat=1, setup=None):
+    """Return (result, best wall time in seconds, peak memory in bytes) of function(*setup())."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        arguments = setup() if setup is not None else ()
+        start = time.perf_counter()
+        result = function(*arguments)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    arguments = setup() if setup is not None else ()
+    tracemalloc.start()
+    try:
+        function(*arguments)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def get_module(backend):
+    """Return module of backend (None if its dependencies are not installed)."""
+    if backend == 'python':
+        return tools
+    try:
+        import numpy_tools
+    except ImportError:
+        return None
+    return numpy_tools
+
+
+def benchmark_system(text, backend, algorithms, repeat):
+    """Return list of measurements (load, induce and rename for every algorithm) of one system."""
+    module = get_module(backend)
+    if module is None:
+        return [{'backend': backend, 'phase': 'load', 'skipped': "dependencies are not installed"}]
+
+    (decision_system, names), seconds, peak = measure(lambda: module.get_system_objects(io.StringIO(text)), repeat)
+    results = [{'backend': backend, 'phase': 'load', 'seconds': seconds, 'peak_bytes': peak}]
+    for algorithm in algorithms:
+        function = getattr(module, algorithm)
+        rules, seconds, peak = measure(lambda: module.find_rules(function, decision_system), repeat)
+        results.append({'backend': backend, 'phase': 'induce', 'algorithm': algorithm, 'seconds': seconds,
+                        'peak_bytes': peak, 'rules': len(rules)})
+        _, seconds, peak = measure(tools.rename_rules, repeat, lambda: (copy.deepcopy(rules), names))
+        results.append({'backend': backend, 'phase': 'rename', 'algorithm': algorithm, 'seconds': seconds,
+                        'peak_bytes': peak, 'rules': len(rules)})
+    return results
+
+
+def run(rows_grid, attributes_grid, cardinality=3, classes=2, noise=0.0, algorithms=ALGORITHMS, backends=BACKENDS,
+        repeat=3, seed=0, log=None):
+    """Return list of measurements for every (rows, attributes) of grid and every backend."""
+    results = []
+    for rows in rows_grid:
+        for attributes in attributes_grid:
+            text = generator.get_system_text(rows, attributes, cardinality, classes, noise, True, seed)
+            for backend in backends:
+                for result in benchmark_system(text, backend, algorithms, repeat):
+                    result.update(rows=rows, attributes=attributes, cardinality=cardinality, classes=classes,
+                                  noise=noise)
+                    results.append(result)
+                    if log is not None:
+                        log(format_result(result))
+    return results
+
+
+def get_commit():
+    """Return hash of current git commit (None outside of repository)."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_key(result):
+    """Return key that identifies measurement in results of other commit."""
+    return (result['rows'], result['attributes'], result['cardinality'], result['classes'], result['noise'],
+            result['backend'], result['phase'], result.get('algorithm'))
+
+
+def format_result(result):
+    """Return one line description of measurement."""
+    case = '{rows}x{attributes} {backend} {phase}'.format(**result)
+    if 'algorithm' in result:
+        case += ' ' + result['algorithm']
+    if 'skipped' in result:
+        return '{}: skipped ({})'.format(case, result['skipped'])
+    text = '{}: {:.4f}s, peak {:.1f} KiB'.format(case, result['seconds'], result['peak_bytes'] / 1024)
+    if 'rules' in result:
+        text += ', {} rules'.format(result['rules'])
+    return text
+
+
+def compare(results, baseline):
+    """Generator for lines with ratio of time to time of the same measurement in baseline results."""
+    old = {get_key(result): result for result in baseline if 'seconds' in result}
+    for result in results:
+        previous = old.get(get_key(result))
+        if previous is not None and 'seconds' in result and result['seconds'] > 0:
+            line = '{}: speed-up {:.2f}x'.format(format_result(result).split(':')[0],
+                                                 previous['seconds'] / result['seconds'])
+            if previous.get('rules') != result.get('rules'):
+                line += ' (rules: {} -> {})'.format(previous.get('rules'), result.get('rules'))
+            yield line
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmark rule induction on synthetic decision systems.")
+    parser.add_argument('--grid', choices=sorted(GRIDS), default='small', help="rows and attributes not given")
+    parser.add_argument('--rows', type=int, nargs='+')
+    parser.add_argument('--attributes', type=int, nargs='+')
+    parser.add_argument('--cardinality', type=int, default=3)
+    parser.add_argument('--classes', type=int, default=2)
+    parser.add_argument('--noise', type=float, default=0.0)
+    parser.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="save results in JSON file (default: print JSON)")
+    parser.add_argument('--baseline', help="JSON results of other commit to compare with")
+    parser.add_argument('--python-kernels', action='store_true', help="don't use compiled kernels even if built")
+    options = parser.parse_args(arguments)
+
+    if options.rows is None:
+        options.rows = GRIDS[options.grid][0]
+    if options.attributes is None:
+        options.attributes = GRIDS[options.grid][1]
+    if options.python_kernels:
+        tools.set_kernels(False)
+
+    log = (lambda line: print(line, file=sys.stderr))
+    results = run(options.rows, options.attributes, options.cardinality, options.classes, options.noise,
+                  options.algorithms, options.backends, options.repeat, options.seed, log)
+    report = {'commit': get_commit(), 'python': platform.python_version(), 'created': time.time(),
+              'kernels': 'compiled' if tools.kernels is not None else 'python', 'results': results}
+
+    if options.output is not None:
+        with open(options.output, 'w') as output:
+            json.dump(report, output, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    if options.baseline is not None:
+        with open(options.baseline) as source:
+            baseline = json.load(source)['results']
+        for line in compare(results, baseline):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
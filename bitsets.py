@@ -0,0 +1,245 @@
+"""Packed bitset index of decision system, shared by rule induction algorithms.
+
+Every set of objects is kept as python integer where bit number i is set when object with index i belongs to set.
+Coverage of rule is AND of bitsets of its descriptors and consistency of rule is check that coverage has no common
+bits with objects from other decision classes.
+"""
+import bisect
+import collections
+import itertools
+import threading
+
+TOKENS = itertools.count()  # unique numbers of indexes (keys of shared cache)
+
+
+def get_bitset(indexes, size):
+    """Return integer with bits set on positions from indexes."""
+    bitmap = bytearray((size + 7) // 8)
+    for index in indexes:
+        bitmap[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(bitmap, 'little')
+
+
+# Number of set bits (int.bit_count is in python 3.10+).
+popcount = int.bit_count if hasattr(int, 'bit_count') else lambda bits: bin(bits).count('1')
+
+
+def lowest_bit(bits):
+    """Return index of lowest set bit (-1 if bitset is empty)."""
+    return (bits & -bits).bit_length() - 1
+
+
+def iterate_bits(bits):
+    """Generator for indexes of set bits in ascending order."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class CoverageCache:
+    """Bounded LRU cache: descriptor set -> (decision of consistent rule or None, coverage bitset, support).
+
+    Cache is bounded by number of entries and by bytes of coverage bitsets (bitsets of big systems are large), entries
+    of index are removed by release when run with index ends.
+    """
+
+    def __init__(self, maxsize=1 << 16, maxbytes=1 << 26):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.entries = collections.OrderedDict()
+        self.tokens = {}  # token of index -> set of keys of its entries
+        self.nbytes = 0  # bytes of coverage bitsets of entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, needs_coverage=False):
+        """Return entry (None if it's not in cache) and mark it as recently used.
+
+        When coverage is needed, entry without it (None) is counted as miss, because coverage is calculated anyway.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                if needs_coverage and entry[1] is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        """Add entry (key starts with token of index) and remove the least recently used entries above bounds."""
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = entry
+            self.tokens.setdefault(key[0], set()).add(key)
+            self.nbytes += get_nbytes(entry[1] or 0)
+            self.evict()
+
+    def resize(self, maxsize, maxbytes=None):
+        """Change maximal number of entries (and maximal bytes of bitsets if it is given)."""
+        with self.lock:
+            self.maxsize = maxsize
+            if maxbytes is not None:
+                self.maxbytes = maxbytes
+            self.evict()
+
+    def release(self, token):
+        """Remove all entries of index with token."""
+        with self.lock:
+            for key in list(self.tokens.get(token, ())):
+                self.remove(key)
+
+    def evict(self):
+        """Remove the least recently used entries above maxsize and maxbytes (lock must be held)."""
+        while self.entries and (len(self.entries) > self.maxsize or self.nbytes > self.maxbytes):
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def remove(self, key):
+        """Remove entry (lock must be held)."""
+        entry = self.entries.pop(key)
+        self.nbytes -= get_nbytes(entry[1] or 0)
+        keys = self.tokens[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self.tokens[key[0]]
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self.lock:
+            self.entries.clear()
+            self.tokens.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return dictionary with counters and size of cache."""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'size': len(self.entries),
+                'maxsize': self.maxsize, 'nbytes': self.nbytes, 'maxbytes': self.maxbytes}
+
+
+def get_nbytes(bits):
+    """Return number of bytes of bitset."""
+    return (bits.bit_length() + 7) // 8
+
+
+class BitsetIndex:
+    """Bitsets of objects for every descriptor (attribute, value) and for every decision class.
+
+    With cache, coverage of sets of two and more descriptors is remembered (key contains token and size of index,
+    so one cache can be shared by many indexes and entries of changed index are never used).
+    Objects can have weights (numbers of identical objects they stand for), then every count is sum of weights: bit
+    planes of weights are kept as bitsets, so count is one popcount for every bit of the largest weight.
+    """
+
+    def __init__(self, decision_system, cache=None, weights=None):
+        self.cache = cache
+        self.token = next(TOKENS)
+        self.size = len(decision_system)
+        self.universe = (1 << self.size) - 1
+        self.number_of_attributes = len(decision_system[0]) - 1 if self.size else 0
+
+        descriptor_indexes = {}
+        decision_indexes = {}
+        for index, decision_object in enumerate(decision_system):
+            for attribute in range(self.number_of_attributes):
+                descriptor_indexes.setdefault((attribute, decision_object[attribute]), []).append(index)
+            decision_indexes.setdefault(decision_object[-1], []).append(index)
+
+        self.weights = list(weights) if weights is not None else None
+        self.planes = []  # bitset of objects with bit k of weight set for every k (weighted objects)
+        if self.weights is not None:
+            for bit in range(max(self.weights, default=0).bit_length()):
+                self.planes.append(get_bitset([index for index, weight in enumerate(self.weights) if weight >> bit & 1],
+                                              self.size))
+        self.descriptors = {key: get_bitset(indexes, self.size) for key, indexes in descriptor_indexes.items()}
+        self.counts = {key: self.count(objects) for key, objects in self.descriptors.items()}  # coverage sizes
+        self.values = [[] for _ in range(self.number_of_attributes)]  # sorted values of every attribute
+        for attribute, value in sorted(self.descriptors):
+            self.values[attribute].append(value)
+        self.decisions = {key: get_bitset(indexes, self.size) for key, indexes in decision_indexes.items()}
+        self.table = None  # rows for compiled kernels (tools.get_table), dropped when object is appended
+
+    def count(self, objects):
+        """Return number of objects in bitset (sum of their weights when objects are weighted)."""
+        if self.weights is None:
+            return popcount(objects)
+        return sum(popcount(objects & plane) << bit for bit, plane in enumerate(self.planes))
+
+    def get_coverage(self, descriptors, objects=None):
+        """Return bitset of objects (from all objects or from objects bitset) that fulfill all descriptors."""
+        if self.cache is not None and len(descriptors) > 1:
+            coverage = self.get_entry(descriptors, needs_coverage=True)[1]
+            if coverage is not None:
+                return coverage if objects is None else coverage & objects
+        return self.calculate_coverage(descriptors, self.universe if objects is None else objects)
+
+    def calculate_coverage(self, descriptors, coverage):
+        """Return bitset of objects from coverage bitset that fulfill all descriptors."""
+        for key, value in descriptors.items():
+            coverage &= self.descriptors.get((key, value), 0)
+            if not coverage:
+                break
+        return coverage
+
+    def get_entry(self, descriptors, needs_coverage=False):
+        """Return (decision of consistent rule or None, coverage, support) of descriptors from cache.
+
+        Coverage of inconsistent descriptors (most of checked sets) isn't kept in cache, it is None in their entries
+        (when coverage is needed, such entry is counted as miss of cache).
+        """
+        key = (self.token, self.size, tuple(sorted(descriptors.items())))
+        entry = self.cache.get(key, needs_coverage)
+        if entry is None:
+            coverage = self.calculate_coverage(descriptors, self.universe)
+            entry = (None, coverage, 0)
+            for decision, objects in self.decisions.items():
+                if coverage and not coverage & ~objects:
+                    entry = (decision, coverage, self.count(coverage))
+                    break
+            self.cache.put(key, entry if entry[0] is not None or not coverage else (None, None, 0))
+        return entry
+
+    def is_consistent(self, descriptors, decision):
+        """Return: True if no object from other decision class fulfill descriptors; False if at least one does."""
+        if self.cache is not None and len(descriptors) > 1:
+            consistent_decision, coverage, _ = self.get_entry(descriptors)
+            return consistent_decision == decision or coverage == 0
+        return not self.get_coverage(descriptors) & ~self.decisions.get(decision, 0)
+
+    def get_support(self, descriptors, decision):
+        """Return bitset of objects with decision that fulfill descriptors."""
+        return self.get_coverage(descriptors, self.decisions.get(decision, 0))
+
+    def append(self, decision_object):
+        """Add object at the end of decision system (its index is previous size)."""
+        if not self.size:
+            self.number_of_attributes = len(decision_object) - 1
+            self.values = [[] for _ in range(self.number_of_attributes)]
+        bit = 1 << self.size
+        for attribute in range(self.number_of_attributes):
+            key = (attribute, decision_object[attribute])
+            if key not in self.descriptors:
+                self.descriptors[key] = 0
+                self.counts[key] = 0
+                bisect.insort(self.values[attribute], key[1])
+            self.descriptors[key] |= bit
+            self.counts[key] += 1
+        if self.weights is not None:
+            self.weights.append(1)
+            if not self.planes:
+                self.planes.append(0)
+            self.planes[0] |= bit
+        self.decisions[decision_object[-1]] = self.decisions.get(decision_object[-1], 0) | bit
+        self.size += 1
+        self.universe |= bit
+        self.table = None
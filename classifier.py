@@ -0,0 +1,150 @@
+"""Classifier that applies induced rules to new objects.
+
+Rule list is compiled to inverted index: for every attribute there are bitsets of rules (bit i is rule i) for every
+value of descriptor and bitset of rules without descriptor on that attribute. Rules matched by object are AND of one
+bitset per attribute, so all rules are checked at once. Votes are weighted by support of rules, rules are grouped by
+(decision, support), so voting is one popcount for every group. Objects with same values are classified once.
+"""
+import sys
+import time
+
+import bitsets
+
+MAJORITY = 'majority'  # unmatched objects get decision with the largest support of all rules
+
+
+class RuleClassifier:
+    """Compiled rule set with support-weighted voting."""
+
+    def __init__(self, rules, unmatched=MAJORITY):
+        self.number_of_rules = len(rules)
+        self.attributes = sorted({attribute for rule in rules for attribute in rule.descriptors})
+        all_rules = (1 << self.number_of_rules) - 1
+
+        descriptor_indexes = {}  # (attribute, value) -> rules indexes
+        attribute_indexes = {}  # attribute -> rules indexes
+        group_indexes = {}  # (decision, support) -> rules indexes
+        for rule_index, rule in enumerate(rules):
+            for attribute, value in rule.descriptors.items():
+                descriptor_indexes.setdefault((attribute, value), []).append(rule_index)
+                attribute_indexes.setdefault(attribute, []).append(rule_index)
+            group_indexes.setdefault((rule.decision, rule.support), []).append(rule_index)
+
+        self.descriptors = {}  # attribute -> {value: rules with descriptor}
+        for (attribute, value), indexes in descriptor_indexes.items():
+            self.descriptors.setdefault(attribute, {})[value] = bitsets.get_bitset(indexes, self.number_of_rules)
+        self.free = {attribute: all_rules & ~bitsets.get_bitset(indexes, self.number_of_rules)
+                     for attribute, indexes in attribute_indexes.items()}  # rules without attribute
+        self.groups = [(decision, support, bitsets.get_bitset(indexes, self.number_of_rules))
+                       for (decision, support), indexes in group_indexes.items()]
+
+        self.totals = {}  # decision -> sum of supports of all rules
+        for rule in rules:
+            self.totals[rule.decision] = self.totals.get(rule.decision, 0) + rule.support
+        self.unmatched = unmatched
+        self.all_rules = all_rules
+
+    def get_matched(self, decision_object):
+        """Return bitset of rules fulfilled by object."""
+        matched = self.all_rules
+        for attribute in self.attributes:
+            matched &= self.descriptors[attribute].get(decision_object[attribute], 0) | self.free[attribute]
+            if not matched:
+                break
+        return matched
+
+    def get_votes(self, decision_object):
+        """Return dictionary: decision -> sum of supports of fulfilled rules."""
+        matched = self.get_matched(decision_object)
+        votes = {}
+        if matched:
+            for decision, support, group in self.groups:
+                count = bitsets.popcount(matched & group)
+                if count:
+                    votes[decision] = votes.get(decision, 0) + count * max(support, 1)
+        return votes
+
+    def classify(self, decision_object):
+        """Return decision for one object (ties as in get_best)."""
+        votes = self.get_votes(decision_object)
+        if not votes:
+            return self.get_unmatched()
+        return get_best(votes, self.totals)
+
+    def get_unmatched(self):
+        """Return decision for object that doesn't fulfill any rule."""
+        if self.unmatched == MAJORITY:
+            return get_best(self.totals, self.totals) if self.totals else None
+        return self.unmatched
+
+    def predict(self, objects):
+        """Return list of decisions for batch of encoded objects (rows may contain decision column too)."""
+        decisions = []
+        known = {}  # object values -> decision
+        for decision_object in objects:
+            key = tuple(decision_object[attribute] for attribute in self.attributes)
+            decision = known.get(key)
+            if decision is None and key not in known:
+                decision = known[key] = self.classify(decision_object)
+            decisions.append(decision)
+        return decisions
+
+
+def get_best(votes, totals):
+    """Return decision with the most votes (ties go to larger support of all rules, then to smaller decision)."""
+    return min(votes, key=lambda decision: (-votes[decision], -totals[decision], decision))
+
+
+# Reference implementation and benchmark. <-----------------------------------------------------------------------------
+def naive_predict(rules, objects, unmatched=None):
+    """Return list of decisions by checking every rule against every object."""
+    totals = {}
+    for rule in rules:
+        totals[rule.decision] = totals.get(rule.decision, 0) + rule.support
+    decisions = []
+    for decision_object in objects:
+        votes = {}
+        for rule in rules:
+            if all(decision_object[key] == value for key, value in rule.descriptors.items()):
+                votes[rule.decision] = votes.get(rule.decision, 0) + max(rule.support, 1)
+        if votes:
+            decisions.append(get_best(votes, totals))
+        else:
+            decisions.append(unmatched)
+    return decisions
+
+
+def benchmark(rules, objects):
+    """Return times (seconds) and throughputs (objects per second) of naive and compiled prediction."""
+    start = time.perf_counter()
+    classifier = RuleClassifier(rules, unmatched=None)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classifier.predict(objects)
+    compiled_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive_predict(rules, objects)
+    naive_time = time.perf_counter() - start
+
+    return {'objects': len(objects), 'rules': len(rules), 'compile': compile_time,
+            'compiled': compiled_time, 'naive': naive_time,
+            'compiled_throughput': len(objects) / compiled_time if compiled_time else float('inf'),
+            'naive_throughput': len(objects) / naive_time if naive_time else float('inf'),
+            'speed_up': naive_time / compiled_time if compiled_time else float('inf')}
+
+
+def main(arguments):
+    """Benchmark prediction with rules of algorithm (covering, exhaustive or lem2) on objects from file."""
+    import tools
+    path, algorithm = arguments[0], arguments[1] if len(arguments) > 1 else 'lem2'
+    with open(path) as file:
+        decision_system, _ = tools.get_system_objects(file)
+    rules = tools.find_rules(getattr(tools, algorithm), decision_system)
+    for key, value in benchmark(rules, decision_system).items():
+        print('{}: {}'.format(key, value))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,314 @@
+"""Command line entry point: induce rules for many decision system files without GUI.
+
+Example:
+    python cli.py data/*.txt --algorithm lem2 --format json csv --output-dir rules --jobs 4
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import csv
+import glob
+import json
+import os
+import sys
+import time
+
+import instrumentation
+import model_file
+import reducts
+import system_loader
+import tools
+import weighted
+from rule_set import RuleSet
+
+ALGORITHMS = ('covering', 'exhaustive', 'lem2')
+FORMATS = ('json', 'csv', 'model')
+
+
+# Output of rules. <----------------------------------------------------------------------------------------------------
+def rule_to_dict(rule):
+    """Return rule as dictionary that can be saved in JSON (attributes are named a1, a2, ... as in CSV header)."""
+    return {'descriptors': {'a{}'.format(key + 1): value for key, value in rule.descriptors.items()},
+            'decision': rule.decision, 'support': rule.support, 'scale': rule.scale}
+
+
+def write_json(rules, path):
+    """Save rules in JSON file."""
+    with open(path, 'w') as output:
+        write_rules(rules, [json_writer(output)])
+
+
+def write_csv(rules, path, number_of_attributes):
+    """Save rules in CSV file: one column for every attribute (empty if not used), decision, support and scale."""
+    with open(path, 'w', newline='') as output:
+        write_rules(rules, [csv_writer(output, number_of_attributes)])
+
+
+def json_writer(output):
+    """Coroutine that writes rules sent to it as JSON list, list is ended when coroutine is closed."""
+    separator = '[\n'
+    try:
+        while True:
+            rule = yield
+            lines = json.dumps(rule_to_dict(rule), indent=1).split('\n')
+            output.write(separator + '\n'.join(' ' + line for line in lines))
+            separator = ',\n'
+    finally:
+        output.write('[]' if separator == '[\n' else '\n]')
+
+
+def csv_writer(output, number_of_attributes):
+    """Coroutine that writes rules sent to it as rows of CSV file (header is written at start)."""
+    writer = csv.writer(output)
+    writer.writerow(['a{}'.format(attribute + 1) for attribute in range(number_of_attributes)] +
+                    ['decision', 'support', 'scale'])
+    while True:
+        rule = yield
+        writer.writerow([rule.descriptors.get(attribute, '') for attribute in range(number_of_attributes)] +
+                        [rule.decision, rule.support, rule.scale])
+
+
+def write_rules(rules, writers):
+    """Send every rule from iterable to all writers (coroutines) as it comes and close them, return number of rules."""
+    for writer in writers:
+        next(writer)
+    count = 0
+    try:
+        for rule in rules:
+            for writer in writers:
+                writer.send(rule)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    return count
+
+
+WRITERS = {'json': lambda rules, path, number_of_attributes: write_json(rules, path), 'csv': write_csv}
+
+
+def write_outputs(path, rules, decision_system, names, algorithm, formats, output_dir=None):
+    """Save RuleSet of system from path in every format (next to path or in output_dir), return output paths."""
+    outputs = []
+    for output_format in formats:
+        output_path = get_output_path(path, algorithm, output_format, output_dir)
+        if output_format == 'model':  # encoded system, names and rules, opened by model_file.load_model
+            model_file.save_model(output_path, decision_system, names, rules, {'algorithm': algorithm})
+        else:
+            WRITERS[output_format](rules.decoded(), output_path, len(decision_system[0]) - 1)
+        outputs.append(output_path)
+    return outputs
+
+
+def stream_outputs(path, rules, number_of_attributes, algorithm, formats, output_dir=None):
+    """Save decoded rules from iterable in every format while they come, return output paths and number of rules."""
+    if 'model' in formats:
+        raise ValueError("Model file needs all rules, it can't be streamed.")
+    outputs = [get_output_path(path, algorithm, output_format, output_dir) for output_format in formats]
+    with contextlib.ExitStack() as stack:
+        writers = []
+        for output_format, output_path in zip(formats, outputs):
+            output = stack.enter_context(open(output_path, 'w', newline=''))
+            writers.append(json_writer(output) if output_format == 'json' else csv_writer(output, number_of_attributes))
+        return outputs, write_rules(rules, writers)
+
+
+def get_output_path(path, algorithm, output_format, output_dir=None):
+    """Return path of output file of system from path (next to path or in output_dir)."""
+    base = os.path.splitext(os.path.basename(path))[0]
+    directory = output_dir if output_dir is not None else os.path.dirname(path)
+    return os.path.join(directory, '{}.{}.{}'.format(base, algorithm, output_format))
+
+
+# Processing of files. <------------------------------------------------------------------------------------------------
+def get_paths(patterns):
+    """Return sorted list of files matched by paths or glob patterns (without duplicates)."""
+    paths = []
+    for pattern in patterns:
+        matched = glob.glob(pattern) if glob.has_magic(pattern) else [pattern]
+        for path in sorted(matched):
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def load_file(path):
+    """Return (decision system in compact columns, names) of text file, columns are mapped from cache next to it."""
+    decision_system = system_loader.load_system(path)
+    if not len(decision_system):
+        raise ValueError("{} has no objects.".format(path))
+    return decision_system, decision_system.names
+
+
+def process_file(path, algorithm='lem2', formats=('json',), output_dir=None, backend='python', workers=1,
+                 profile=False, deduplicate=False, reduct=None, stream=None):
+    """Induce rules from file, save them and return dictionary with number of rules and timings of phases.
+
+    With profile, result has records of instrumentation.Profiler for induction phase. With deduplicate, rules are
+    induced from weighted unique rows and result has report of deduplication. With reduct method ('greedy' or
+    'exact'), rules use only attributes of reduct. With stream (dictionary of limits of tools.iterate_rules, e.g.
+    max_rules), rules are written while they are found (python backend in one process) in one 'stream' phase.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    decision_system, names = load_file(path)
+    timings['load'] = time.perf_counter() - start
+
+    report = None
+    if deduplicate:
+        start = time.perf_counter()
+        decision_system = weighted.deduplicate(decision_system)
+        report = decision_system.get_report()
+        timings['deduplicate'] = time.perf_counter() - start
+
+    attributes = None
+    if reduct is not None:
+        start = time.perf_counter()
+        attributes = reducts.get_reduct(decision_system, reduct)
+        timings['reduct'] = time.perf_counter() - start
+
+    profiler = instrumentation.Profiler(names=names) if profile else None
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.start()
+    try:
+        if stream is not None:
+            rules = tools.iterate_rules(getattr(tools, algorithm), decision_system, attributes, **stream)
+            outputs, number_of_rules = stream_outputs(path, (tools.rename_rule(rule, names) for rule in rules),
+                                                      len(decision_system[0]) - 1, algorithm, formats, output_dir)
+        else:
+            rules = tools.find_rules(getattr(tools, algorithm), decision_system, backend=backend, workers=workers,
+                                     rules=RuleSet(), attributes=attributes)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+    if stream is not None:
+        timings['stream'] = time.perf_counter() - start
+    else:
+        timings['induce'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tools.rename_rules(rules, names)
+        timings['rename'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        outputs = write_outputs(path, rules, decision_system, names, algorithm, formats, output_dir)
+        timings['write'] = time.perf_counter() - start
+        number_of_rules = len(rules)
+
+    result = {'path': path, 'algorithm': algorithm, 'objects': len(decision_system), 'rules': number_of_rules,
+              'outputs': outputs, 'timings': timings}
+    if attributes is not None:
+        result['reduct'] = attributes
+    if report is not None:
+        result['objects'] = report['objects']
+        result['deduplication'] = report
+    if profiler is not None:
+        result['profile'] = {'records': profiler.get_records(), 'summary': list(profiler.format_summary())}
+    return result
+
+
+def process_files(paths, algorithm='lem2', formats=('json',), output_dir=None, backend='python', workers=1,
+                  jobs=1, profile=False, deduplicate=False, reduct=None, stream=None):
+    """Generator for results of process_file for every path (files are processed in jobs processes)."""
+    arguments = (algorithm, formats, output_dir, backend, workers, profile, deduplicate, reduct, stream)
+    if jobs <= 1:
+        for path in paths:
+            yield process_file(path, *arguments)
+        return
+    with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+        futures = [pool.submit(process_file, path, *arguments) for path in paths]
+        for future in futures:
+            yield future.result()
+
+
+def format_result(result):
+    """Return one line summary of result of process_file."""
+    timings = ' '.join('{}={:.3f}s'.format(phase, seconds) for phase, seconds in result['timings'].items())
+    line = '{}: {} objects, {} rules ({}) {}'.format(result['path'], result['objects'], result['rules'],
+                                                     result['algorithm'], timings)
+    if 'reduct' in result:
+        line += '\n    reduct: {}'.format(' '.join('a{}'.format(attribute + 1) for attribute in result['reduct']))
+    if 'deduplication' in result:
+        line += '\n    ' + weighted.format_report(result['deduplication'])
+    return line
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Induce decision rules from decision system files.")
+    parser.add_argument('inputs', nargs='+', help="decision system files or glob patterns")
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='lem2')
+    parser.add_argument('-f', '--format', nargs='+', choices=FORMATS, default=['json'], dest='formats')
+    parser.add_argument('-o', '--output-dir', help="directory for rule files (default: next to input file)")
+    parser.add_argument('-b', '--backend', choices=('python', 'numpy'), default='python')
+    parser.add_argument('-w', '--workers', type=int, default=1, help="processes for induction of one file")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="files processed concurrently")
+    parser.add_argument('--timings', help="save results with timings of phases in JSON file")
+    parser.add_argument('-d', '--deduplicate', action='store_true',
+                        help="induce rules from unique objects weighted by number of duplicates")
+    parser.add_argument('-r', '--reduct', choices=reducts.METHODS,
+                        help="search rules only with attributes of reduct found by method")
+    parser.add_argument('--profile', metavar='TRACE',
+                        help="count and time calls inside algorithm and save them in JSON lines file")
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help="write rules while they are found (json and csv formats, python backend)")
+    parser.add_argument('--max-scale', type=int, help="stream only rules with at most this number of descriptors")
+    parser.add_argument('--min-support', type=int, help="stream only rules with at least this support")
+    parser.add_argument('--max-rules', type=int, help="stop stream after this number of rules")
+    return parser
+
+
+def main(arguments=None):
+    options = get_parser().parse_args(arguments)
+    paths = get_paths(options.inputs)
+    if not paths:
+        print("No input files.", file=sys.stderr)
+        return 1
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        print("File not found: {}".format(', '.join(missing)), file=sys.stderr)
+        return 1
+    if options.deduplicate and options.backend != 'python':
+        print("Deduplicated (weighted) rows need python backend.", file=sys.stderr)
+        return 1
+    stream = None
+    if options.stream:
+        if 'model' in options.formats or options.backend != 'python':
+            print("Stream writes only json and csv formats with python backend.", file=sys.stderr)
+            return 1
+        stream = {'max_scale': options.max_scale, 'min_support': options.min_support or 0,
+                  'max_rules': options.max_rules}
+    elif (options.max_scale, options.min_support, options.max_rules) != (None, None, None):
+        print("Limits --max-scale, --min-support and --max-rules need --stream.", file=sys.stderr)
+        return 1
+    if options.output_dir is not None:
+        os.makedirs(options.output_dir, exist_ok=True)
+
+    if options.profile is not None:
+        open(options.profile, 'w').close()  # trace of this run only
+
+    start = time.perf_counter()
+    results = []
+    for result in process_files(paths, options.algorithm, options.formats, options.output_dir, options.backend,
+                                options.workers, options.jobs, options.profile is not None, options.deduplicate,
+                                options.reduct, stream):
+        print(format_result(result))
+        if 'profile' in result:
+            profile = result.pop('profile')
+            for line in profile['summary']:
+                print('    ' + line)
+            instrumentation.write_trace(options.profile, profile['records'], path=result['path'],
+                                        algorithm=result['algorithm'])
+        results.append(result)
+    print('total: {} files, {:.3f}s'.format(len(results), time.perf_counter() - start))
+
+    if options.timings is not None:
+        with open(options.timings, 'w') as output:
+            json.dump(results, output, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
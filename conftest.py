@@ -0,0 +1,28 @@
+"""Shared fixtures of tests: generated decision systems and comparable keys of rules."""
+import io
+
+import pytest
+
+import generator
+import tools
+
+
+def get_system(rows, attributes, cardinality=3, classes=3, noise=0.1, seed=0, consistent=True):
+    """Return (encoded objects, names) of system from generator."""
+    text = generator.get_system_text(rows, attributes, cardinality, classes, noise, consistent, seed)
+    return tools.get_system_objects(io.StringIO(text))
+
+
+def get_rule_keys(rules):
+    """Return list of (sorted descriptors, decision, support) of rules (Rule and CompactRule give the same keys)."""
+    return [(sorted(rule.descriptors.items()), rule.decision, rule.support) for rule in rules]
+
+
+@pytest.fixture
+def make_system():
+    return get_system
+
+
+@pytest.fixture
+def rule_keys():
+    return get_rule_keys
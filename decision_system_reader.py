@@ -1,4 +1,10 @@
+import itertools
+import queue
+import threading
+import time
+import instrumentation
 import tools
+from rule_set import RuleSet
 from tkinter import *
 from tkinter import ttk
 import tkinter.filedialog as filedialog
@@ -6,12 +12,22 @@ import tkinter.messagebox as messagebox
 
 
 class MainFrame(Frame):
+    POLL_INTERVAL = 100  # ms between checks of messages from worker thread
+    INSERT_BATCH = 500  # rules inserted to tree in one call of event loop
+    TRACE_SUFFIX = '.trace.jsonl'  # profile of calculation is saved next to system file
+
     def __init__(self, parent):
         Frame.__init__(self, parent)
 
         self.parent = parent
         self.system_file_path = ''
         self.type_filename = ''
+        self.messages = queue.Queue()  # messages from worker thread: (kind, data)
+        self.cancel_event = threading.Event()
+        self.worker = None
+        self.insert_job = None  # id of scheduled batch of tree inserts
+        self.last_progress = 0.0  # time of last progress message
+        self.profile_lines = None  # summary of profile of last calculation
         self.__init_ui()
 
     def __init_ui(self):
@@ -44,9 +60,26 @@ class MainFrame(Frame):
         self.radio_button3 = Radiobutton(rb_frame, text="LEM2", variable=self.algorithm, value=3)
         self.radio_button3.pack(side=LEFT, padx=5, pady=5)
 
+        self.profile = BooleanVar()
+        self.profile_check = Checkbutton(rb_frame, text="Profile", variable=self.profile)
+        self.profile_check.pack(side=LEFT, padx=5, pady=5)
+
+        self.cancel_button = Button(rb_frame, text="Cancel", state=DISABLED, command=self.__cancel)
+        self.cancel_button.pack(side=RIGHT, padx=5, pady=5)
+
         self.start_button = Button(rb_frame, text="GO!", state=DISABLED, command=self.__get_decision_system)
         self.start_button.pack(padx=5, pady=5, fill=X)
 
+        progress_frame = Frame(self)  # progress of calculation
+        progress_frame.pack(fill=X)
+
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress_bar.pack(side=LEFT, padx=5, fill=X, expand=True)
+
+        self.status = StringVar()
+        self.status_label = Label(progress_frame, textvariable=self.status, width=25, anchor=W)
+        self.status_label.pack(side=LEFT, padx=5)
+
         tree_frame = Frame(self)  # 3rd frame // tree
         tree_frame.pack(fill=BOTH, expand=True)
 
@@ -74,24 +107,125 @@ class MainFrame(Frame):
             self.start_button.config(state=NORMAL)
 
     def insert_rules(self, rules):
+        """Insert order nodes at once and rules of every order in batches (tree stays responsive)."""
+        self.__stop_inserting()
         self.tree.delete(*self.tree.get_children())
         self.tree.insert("", 1, 1, text="All orders", values=rules.__len__())
         scales = tools.get_scales(rules)
         for scale in scales:
             self.tree.insert(1, scale+1, scale+1, text="Order {}".format(scale),
                              values=tools.get_rule_scale_length(rules, scale))
-            for string_rule in tools.scale_rules(rules, scale):
-                self.tree.insert(scale+1, scale+1, text=string_rule)
+        items = ((scale, string_rule) for scale in scales for string_rule in tools.scale_rules(rules, scale))
+        self.__insert_batch(items)
+
+    def __insert_batch(self, items):
+        self.insert_job = None
+        batch = list(itertools.islice(items, self.INSERT_BATCH))
+        for scale, string_rule in batch:
+            self.tree.insert(scale+1, END, text=string_rule)
+        if len(batch) == self.INSERT_BATCH:
+            self.insert_job = self.after(1, self.__insert_batch, items)
+
+    def __stop_inserting(self):
+        if self.insert_job is not None:
+            self.after_cancel(self.insert_job)
+            self.insert_job = None
 
     def __get_decision_system(self):
+        """Start calculation of rules in worker thread."""
+        self.cancel_event.clear()
+        self.profile_lines = None
+        self.start_button.config(state=DISABLED)
+        self.load_system_button.config(state=DISABLED)
+        self.cancel_button.config(state=NORMAL)
+        self.progress_bar.config(value=0, maximum=1)
+        self.status.set("Loading system...")
+        self.worker = threading.Thread(target=self.__find_rules, daemon=True,
+                                       args=(self.system_file_path, self.__get_algorithm(), self.profile.get()))
+        self.worker.start()
+        self.after(self.POLL_INTERVAL, self.__check_messages)
+
+    def __find_rules(self, path, algorithm, profile=False):
+        """Body of worker thread: load system and calculate rules (results are sent by messages)."""
         try:
-            with open(self.system_file_path) as file:
+            with open(path) as file:
                 decision_system, names = tools.get_system_objects(file)
-            rules = tools.find_rules(self.__get_algorithm(), decision_system)
-            tools.rename_rules(rules, names)
-            self.insert_rules(rules)
+            self.messages.put(('progress', (0, 1)))
+            profiler = instrumentation.Profiler(names=names) if profile else None
+            if profiler is not None:
+                profiler.start()
+            try:
+                rules = tools.find_rules(algorithm, decision_system, progress=self.__progress, rules=RuleSet(names))
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+            if profiler is not None:
+                profiler.write_trace(path + self.TRACE_SUFFIX, algorithm=algorithm.__name__)
+                self.messages.put(('profile', list(profiler.format_summary())))
+            self.messages.put(('done', rules))
+        except tools.Cancelled:
+            self.messages.put(('cancelled', None))
         except FileNotFoundError:
-            messagebox.showerror("Error", "Oops! File not found!")
+            self.messages.put(('error', "Oops! File not found!"))
+        except (ValueError, IndexError) as error:
+            self.messages.put(('error', "Can't calculate rules: {}".format(error)))
+        except Exception as error:  # every failure must end polling of messages
+            self.messages.put(('error', "Unexpected error: {}: {}".format(type(error).__name__, error)))
+
+    def __progress(self, done, total):
+        """Progress function called by algorithm in worker thread (reports are sent at most every poll interval)."""
+        if self.cancel_event.is_set():
+            raise tools.Cancelled()
+        now = time.monotonic()
+        if done == total or now - self.last_progress >= self.POLL_INTERVAL / 1000:
+            self.last_progress = now
+            self.messages.put(('progress', (done, total)))
+
+    def __check_messages(self):
+        """Handle messages from worker thread in event loop."""
+        try:
+            while True:
+                kind, data = self.messages.get_nowait()
+                if kind == 'progress':
+                    done, total = data
+                    self.progress_bar.config(value=done, maximum=max(total, 1))
+                    self.status.set("{}: {}/{}".format(self.__get_progress_unit(), done, total))
+                    continue
+                if kind == 'profile':
+                    self.profile_lines = data
+                    continue
+                self.__finish()
+                if kind == 'done':
+                    self.status.set("Found {} rules".format(len(data)))
+                    self.insert_rules(data)
+                    self.__show_profile()
+                elif kind == 'cancelled':
+                    self.status.set("Cancelled")
+                elif kind == 'error':
+                    self.status.set("")
+                    messagebox.showerror("Error", data)
+                return
+        except queue.Empty:
+            self.after(self.POLL_INTERVAL, self.__check_messages)
+
+    def __show_profile(self):
+        if self.profile_lines is not None:
+            messagebox.showinfo("Profile", '\n'.join(self.profile_lines + ["", "Trace saved in {}".format(
+                self.system_file_path + self.TRACE_SUFFIX)]))
+            self.profile_lines = None
+
+    def __finish(self):
+        self.worker = None
+        self.cancel_button.config(state=DISABLED)
+        self.load_system_button.config(state=NORMAL)
+        self.start_button.config(state=NORMAL)
+
+    def __cancel(self):
+        self.cancel_event.set()
+        self.status.set("Cancelling...")
+
+    def __get_progress_unit(self):
+        return {1: "Order", 2: "Object", 3: "Concept"}[self.algorithm.get()]
 
     def __get_algorithm(self):
         if self.algorithm.get() == 1:
@@ -0,0 +1,91 @@
+"""Encoder of symbolic values to integer codes with one dictionary per column of decision system.
+
+Codes in every column are dense and start from 0, so they can be used as indexes of lookup tables. One encoder can be
+shared by concurrent loaders and saved dictionaries can be loaded again to encode new data the same way.
+"""
+import json
+import threading
+
+
+class Encoder:
+    """Per-column dictionaries of values (value -> code)."""
+
+    def __init__(self, dictionaries=None, frozen=False):
+        self.dictionaries = [dict(dictionary) for dictionary in dictionaries] if dictionaries else []
+        self.names = [get_names(dictionary) for dictionary in self.dictionaries]  # code -> value for every column
+        self.frozen = frozen  # if True unknown values are error instead of new codes
+        self.lock = threading.Lock()
+
+    @property
+    def number_of_columns(self):
+        return len(self.dictionaries)
+
+    def encode(self, values):
+        """Return list of codes for list of values (one value for every column)."""
+        if len(values) != len(self.dictionaries):
+            self.add_columns(len(values))
+        codes = []
+        for column, value in enumerate(values):
+            code = self.dictionaries[column].get(value)
+            if code is None:
+                code = self.add_value(column, value)
+            codes.append(code)
+        return codes
+
+    def encode_line(self, line):
+        """Return list of codes for line of text file (values separated by ' ')."""
+        return self.encode(line.rstrip().split(' '))
+
+    def decode(self, column, code):
+        """Return symbolic value of code from column."""
+        return self.names[column][code]
+
+    def add_columns(self, number_of_columns):
+        """Create dictionaries for columns (only before first value is encoded)."""
+        with self.lock:
+            if len(self.dictionaries) == number_of_columns:
+                return
+            if self.dictionaries:
+                raise ValueError("Object has {} values, expected {}.".format(number_of_columns,
+                                                                            len(self.dictionaries)))
+            self.dictionaries = [{} for _ in range(number_of_columns)]
+            self.names = [[] for _ in range(number_of_columns)]
+
+    def add_value(self, column, value):
+        """Return new code of value in column (code of other thread if value was added in the meantime)."""
+        with self.lock:
+            dictionary = self.dictionaries[column]
+            code = dictionary.get(value)
+            if code is None:
+                if self.frozen:
+                    raise KeyError("Unknown value {!r} in column {}.".format(value, column))
+                code = len(dictionary)
+                self.names[column].append(value)  # names first, so readers never see code without name
+                dictionary[value] = code
+            return code
+
+    def get_max_code(self):
+        """Return largest code used in any column (-1 if nothing is encoded)."""
+        return max((len(dictionary) - 1 for dictionary in self.dictionaries), default=-1)
+
+    def save(self, path):
+        """Save dictionaries in JSON file (list of values for every column, position is code)."""
+        with self.lock:
+            names = [list(column_names) for column_names in self.names]
+        with open(path, 'w') as output:
+            json.dump(names, output)
+
+    @classmethod
+    def load(cls, path, frozen=False):
+        """Return encoder with dictionaries saved by save."""
+        with open(path) as source:
+            names = json.load(source)
+        return cls([{value: code for code, value in enumerate(column_names)} for column_names in names], frozen)
+
+
+def get_names(dictionary):
+    """Return list of values ordered by codes."""
+    names = [None] * len(dictionary)
+    for value, code in dictionary.items():
+        names[code] = value
+    return names
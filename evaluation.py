@@ -0,0 +1,190 @@
+"""Evaluation of quality of rules by k-fold cross-validation or train/test split.
+
+Decision system is encoded once and copied once to shared memory (as in parallel.py), every fold is only pair of
+index arrays (train and test objects), and algorithms see train objects through SystemView, so system is never copied
+for fold. Tasks (algorithm, fold) run in pool of processes. Rules of train objects classify test objects by
+classifier.RuleClassifier: accuracy is share of test objects with right decision, coverage is share of test objects
+that fulfill at least one rule.
+
+Example:
+    python evaluation.py system.txt --algorithms covering lem2 --folds 10 --workers 4
+"""
+import argparse
+import array
+import concurrent.futures
+import json
+import random
+import statistics
+import sys
+import time
+from multiprocessing import shared_memory
+
+import parallel
+import tools
+from classifier import RuleClassifier
+
+ALGORITHMS = ('covering', 'exhaustive', 'lem2')
+
+worker = {}  # state of worker process: shared memory and decision system
+
+
+class SystemView:
+    """Objects of decision system from index array (object i of view is object indexes[i] of system)."""
+
+    def __init__(self, decision_system, indexes):
+        self.decision_system = decision_system
+        self.indexes = indexes
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, index):
+        return self.decision_system[self.indexes[index]]
+
+    def __iter__(self):
+        for index in self.indexes:
+            yield self.decision_system[index]
+
+
+# Folds. <--------------------------------------------------------------------------------------------------------------
+def get_folds(number_of_objects, folds=5, seed=None):
+    """Return list of (train indexes, test indexes) arrays of k-fold cross-validation (objects are shuffled)."""
+    if not 2 <= folds <= number_of_objects:
+        raise ValueError("Number of folds must be between 2 and number of objects.")
+    order = list(range(number_of_objects))
+    random.Random(seed).shuffle(order)
+    parts = [sorted(order[fold::folds]) for fold in range(folds)]
+    return [(array.array('I', sorted(index for other, part in enumerate(parts) if other != fold for index in part)),
+             array.array('I', parts[fold])) for fold in range(folds)]
+
+
+def get_split(number_of_objects, test_size=0.3, seed=None):
+    """Return list with one (train indexes, test indexes) pair, test_size is share of test objects."""
+    order = list(range(number_of_objects))
+    random.Random(seed).shuffle(order)
+    number_of_tests = min(max(1, round(number_of_objects * test_size)), number_of_objects - 1)
+    return [(array.array('I', sorted(order[number_of_tests:])), array.array('I', sorted(order[:number_of_tests])))]
+
+
+# Tasks. <--------------------------------------------------------------------------------------------------------------
+def init_worker(name, layout, number_of_objects):
+    """Map shared decision system (once for every worker)."""
+    memory = shared_memory.SharedMemory(name=name)
+    worker['memory'] = memory
+    worker['decision_system'] = parallel.map_system(memory.buf, layout, number_of_objects)
+
+
+def evaluate_fold(algorithm, train_indexes, test_indexes, decision_system=None):
+    """Return rule count, induction time, accuracy and coverage of rules of algorithm (name) for one fold.
+
+    Fold where algorithm can't find rules (e.g. LEM2 on inconsistent train objects) has only algorithm and error.
+    """
+    if decision_system is None:
+        decision_system = worker['decision_system']
+    train = SystemView(decision_system, train_indexes)
+    test = SystemView(decision_system, test_indexes)
+
+    start = time.perf_counter()
+    try:
+        rules = tools.find_rules(getattr(tools, algorithm), train)
+    except ValueError as error:
+        return {'algorithm': algorithm, 'error': str(error)}
+    seconds = time.perf_counter() - start
+
+    predictions = RuleClassifier(rules, unmatched=None).predict(test)
+    correct = sum(prediction == decision_object[-1] for prediction, decision_object in zip(predictions, test))
+    covered = sum(prediction is not None for prediction in predictions)
+    return {'algorithm': algorithm, 'rules': len(rules), 'seconds': seconds, 'accuracy': correct / len(test),
+            'coverage': covered / len(test), 'covered_accuracy': correct / covered if covered else 0.0}
+
+
+def evaluate(decision_system, algorithms=ALGORITHMS, folds=None, workers=1):
+    """Return list of results of evaluate_fold for every algorithm and fold (folds from get_folds or get_split)."""
+    if folds is None:
+        folds = get_folds(len(decision_system))
+    tasks = [(algorithm, train, test) for algorithm in algorithms for train, test in folds]
+    if workers <= 1:
+        return [evaluate_fold(*task, decision_system=decision_system) for task in tasks]
+
+    memory, layout = parallel.share_system(decision_system)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=init_worker,
+                                                    initargs=(memory.name, layout, len(decision_system))) as pool:
+            return list(pool.map(evaluate_fold, *zip(*tasks)))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+# Report. <-------------------------------------------------------------------------------------------------------------
+def summarize(results):
+    """Return dictionary: algorithm -> means (and standard deviation of accuracy) of results of folds.
+
+    Failed folds are only counted (with first error), algorithm that failed in every fold has no means.
+    """
+    summary = {}
+    for algorithm in tools.get_unique(result['algorithm'] for result in results):
+        failed = [result for result in results if result['algorithm'] == algorithm and 'error' in result]
+        folds = [result for result in results if result['algorithm'] == algorithm and 'error' not in result]
+        if not folds:
+            summary[algorithm] = {'folds': 0, 'failed': len(failed), 'error': failed[0]['error']}
+            continue
+        accuracies = [result['accuracy'] for result in folds]
+        summary[algorithm] = {
+            'folds': len(folds),
+            'failed': len(failed),
+            'accuracy': statistics.mean(accuracies),
+            'accuracy_std': statistics.stdev(accuracies) if len(folds) > 1 else 0.0,
+            'coverage': statistics.mean(result['coverage'] for result in folds),
+            'covered_accuracy': statistics.mean(result['covered_accuracy'] for result in folds),
+            'rules': statistics.mean(result['rules'] for result in folds),
+            'seconds': statistics.mean(result['seconds'] for result in folds)}
+    return summary
+
+
+def format_summary(summary):
+    """Generator for one line description of every algorithm."""
+    for algorithm, values in summary.items():
+        if not values['folds']:
+            yield '{}: failed in all {} folds: {}'.format(algorithm, values['failed'], values['error'])
+            continue
+        failed = ', {} failed'.format(values['failed']) if values['failed'] else ''
+        yield ('{}: accuracy {:.3f} (+/- {:.3f}), coverage {:.3f}, accuracy of covered {:.3f}, {:.1f} rules, '
+               'induction {:.4f}s ({} folds{})').format(algorithm, values['accuracy'], values['accuracy_std'],
+                                                         values['coverage'], values['covered_accuracy'],
+                                                         values['rules'], values['seconds'], values['folds'], failed)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Evaluate rules by cross-validation or train/test split.")
+    parser.add_argument('system', help="decision system file")
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument('-k', '--folds', type=int, default=5)
+    parser.add_argument('-t', '--test-size', type=float, help="share of test objects (train/test split, no folds)")
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="save results of every fold and summary in JSON file")
+    options = parser.parse_args(arguments)
+
+    with open(options.system) as file:
+        decision_system, _ = tools.get_system_objects(file)
+    if options.test_size is not None:
+        folds = get_split(len(decision_system), options.test_size, options.seed)
+    else:
+        folds = get_folds(len(decision_system), options.folds, options.seed)
+
+    start = time.perf_counter()
+    results = evaluate(decision_system, options.algorithms, folds, options.workers)
+    summary = summarize(results)
+    for line in format_summary(summary):
+        print(line)
+    print('total: {:.3f}s'.format(time.perf_counter() - start))
+
+    if options.output is not None:
+        with open(options.output, 'w') as output:
+            json.dump({'folds': results, 'summary': summary}, output, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
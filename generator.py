@@ -0,0 +1,67 @@
+"""Generator of synthetic decision systems for tests and benchmarks.
+
+Every decision class has random prototype object, decision of object is class of prototype with the most common
+values (ties go to class with lower number). Noise replaces decision with random class. Consistent systems (default)
+keep one decision for all objects with same attributes, so every algorithm can be run on them.
+"""
+import argparse
+import random
+import sys
+
+
+def generate_rows(rows, attributes, cardinality=3, classes=2, noise=0.0, consistent=True, seed=None):
+    """Generator for objects (lists of symbolic values, decision is last)."""
+    generator = random.Random(seed)
+    prototypes = [[generator.randrange(cardinality) for _ in range(attributes)] for _ in range(classes)]
+    decisions = {}  # attributes values -> decision (consistent systems)
+
+    for _ in range(rows):
+        values = tuple(generator.randrange(cardinality) for _ in range(attributes))
+        if consistent and values in decisions:
+            decision = decisions[values]
+        else:
+            decision = get_decision(values, prototypes)
+            if generator.random() < noise:
+                decision = generator.randrange(classes)
+            decisions[values] = decision
+        yield ['v{}'.format(value) for value in values] + ['d{}'.format(decision)]
+
+
+def get_decision(values, prototypes):
+    """Return number of prototype with the most values equal to values of object."""
+    matches = [sum(value == prototype_value for value, prototype_value in zip(values, prototype))
+               for prototype in prototypes]
+    return matches.index(max(matches))
+
+
+def get_system_text(rows, attributes, cardinality=3, classes=2, noise=0.0, consistent=True, seed=None):
+    """Return decision system in format of text files (values separated by ' ', one object in line)."""
+    return ''.join(' '.join(row) + '\n' for row in generate_rows(rows, attributes, cardinality, classes, noise,
+                                                                   consistent, seed))
+
+
+def write_system(path, rows, attributes, cardinality=3, classes=2, noise=0.0, consistent=True, seed=None):
+    """Save generated decision system in text file."""
+    with open(path, 'w') as output:
+        for row in generate_rows(rows, attributes, cardinality, classes, noise, consistent, seed):
+            output.write(' '.join(row) + '\n')
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic decision system.")
+    parser.add_argument('output', help="path of text file")
+    parser.add_argument('-r', '--rows', type=int, default=1000)
+    parser.add_argument('-a', '--attributes', type=int, default=5)
+    parser.add_argument('-c', '--cardinality', type=int, default=3, help="number of values of every attribute")
+    parser.add_argument('-d', '--classes', type=int, default=2, help="number of decision classes")
+    parser.add_argument('-n', '--noise', type=float, default=0.0, help="probability of random decision")
+    parser.add_argument('--inconsistent', action='store_true', help="allow same objects with other decisions")
+    parser.add_argument('-s', '--seed', type=int)
+    options = parser.parse_args(arguments)
+    write_system(options.output, options.rows, options.attributes, options.cardinality, options.classes,
+                 options.noise, not options.inconsistent, options.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
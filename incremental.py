@@ -0,0 +1,185 @@
+"""Incremental maintenance of rules when new objects are added to decision system.
+
+New object makes inconsistent every rule of other decision that it fulfills, such rules are removed and objects that
+they covered are calculated again. Support of rules with decision of new object that it fulfills grows by one (in LEM2
+only first such rule, object is covered once). Objects that are not covered by any rule get new rules:
+    exhaustive - minimal rules of new object and of objects covered by removed rules (rules of other objects can't
+                 change), rules are kept in order of full calculation, so result is the same as find_rules,
+    covering   - first consistent combination of the smallest scale (as in covering),
+    LEM2       - LEM2 run on not covered objects of every concept.
+Rules fulfilled by object are found by inverted index of descriptors, so work depends on number of related rules and
+objects, not on size of rule set.
+"""
+import bitsets
+import classes
+import tools
+from rule_set import RuleSet
+
+
+class IncrementalRules:
+    """Rules of decision system that are updated when objects are added.
+
+    Rules are changed in place (support) and tracked by identity, so rules of RuleSet are copied to list of Rule.
+    """
+
+    def __init__(self, algorithm, decision_system, rules=None):
+        self.algorithm = algorithm
+        self.decision_system = [list(decision_object) for decision_object in decision_system]
+        self.attributes = list(range(len(self.decision_system[0]) - 1))
+        self.index = tools.get_index(self.decision_system)
+        if rules is None:
+            rules = tools.find_rules(algorithm, self.decision_system)
+        elif isinstance(rules, RuleSet):
+            rules = [rule.to_rule() for rule in rules]  # RuleSet makes new object for every access
+        self.rules = rules
+        self.postings = {}  # (attribute, value) -> {id(rule): rule}
+        self.keys = set()  # keys of rules (descriptors and decision)
+        self.order = {}  # id(rule) -> position key in full exhaustive calculation
+        self.sequence = {}  # id(rule) -> number of rule in order of adding
+        self.counter = 0  # number of next added rule
+        self.owned = {}  # id(rule) -> bitset of objects counted in support of LEM2 rule
+        if algorithm is tools.exhaustive:
+            self.unique_objects = tools.get_unique_objects(self.decision_system)
+        if algorithm is tools.lem2:
+            self.set_owned(self.rules, self.index.universe)
+        for rule in self.rules:
+            self.index_rule(rule)
+
+    # Index of rules. <-------------------------------------------------------------------------------------------------
+    def index_rule(self, rule):
+        """Add rule to inverted index of descriptors."""
+        for descriptor in rule.descriptors.items():
+            self.postings.setdefault(descriptor, {})[id(rule)] = rule
+        self.keys.add((tools.get_rule_key(rule), rule.decision))
+        self.sequence[id(rule)] = self.counter
+        self.counter += 1
+        if self.algorithm is tools.exhaustive:
+            self.order[id(rule)] = self.get_order(rule)
+
+    def remove_rule(self, rule):
+        """Remove rule from index (rules list is filtered once after update)."""
+        for descriptor in rule.descriptors.items():
+            del self.postings[descriptor][id(rule)]
+        self.keys.discard((tools.get_rule_key(rule), rule.decision))
+        self.order.pop(id(rule), None)
+        del self.sequence[id(rule)]
+
+    def set_owned(self, rules, objects):
+        """Save objects counted by LEM2 rules: not covered objects (from objects bitset) that rule covers first."""
+        for rule in rules:
+            owned = self.index.get_support(rule.descriptors, rule.decision) & objects
+            self.owned[id(rule)] = owned
+            objects &= ~owned
+
+    def get_order(self, rule):
+        """Return key of rule position in exhaustive: first covered object, scale and attributes."""
+        first_object = bitsets.lowest_bit(self.index.get_support(rule.descriptors, rule.decision))
+        return first_object, len(rule.descriptors), tuple(sorted(rule.descriptors))
+
+    def get_matched(self, decision_object):
+        """Return list of rules (in order of rules) fulfilled by object."""
+        counts = {}  # id(rule) -> [rule, number of fulfilled descriptors]
+        for attribute in self.attributes:
+            for rule_id, rule in self.postings.get((attribute, decision_object[attribute]), {}).items():
+                count = counts.setdefault(rule_id, [rule, 0])
+                count[1] += 1
+        matched = [rule for rule, count in counts.values() if count == len(rule.descriptors)]
+        matched.sort(key=lambda rule: self.sequence[id(rule)])
+        return matched
+
+    def is_covered(self, decision_object):
+        """Return: True if object fulfills at least one rule with its decision; False if not."""
+        return any(rule.decision == decision_object[-1] for rule in self.get_matched(decision_object))
+
+    # Update. <---------------------------------------------------------------------------------------------------------
+    def add_objects(self, objects):
+        """Add encoded objects and update rules; return dictionary with numbers of changed rules."""
+        invalidated = 0
+        updated = 0
+        affected = 0  # bitset of objects that need new rules
+        for decision_object in objects:
+            decision_object = list(decision_object)
+            object_index = len(self.decision_system)
+            self.decision_system.append(decision_object)
+            self.index.append(decision_object)
+            if self.algorithm is tools.exhaustive:
+                self.unique_objects.setdefault(tuple(decision_object), object_index)
+
+            supported = False
+            for rule in self.get_matched(decision_object):
+                if rule.decision != decision_object[-1]:
+                    if self.algorithm is tools.lem2:
+                        affected |= self.owned.pop(id(rule))
+                    else:
+                        affected |= self.index.get_support(rule.descriptors, rule.decision)
+                    self.remove_rule(rule)
+                    invalidated += 1
+                elif self.algorithm is not tools.lem2 or not supported:
+                    self.add_support(rule, object_index)
+                    supported = True
+                    updated += 1
+            if self.algorithm is tools.exhaustive or not supported:
+                affected |= 1 << object_index
+
+        if invalidated:
+            self.rules = [rule for rule in self.rules if id(rule) in self.sequence]
+        new_rules = self.find_new_rules(affected)
+        for rule in new_rules:
+            self.rules.append(rule)
+            self.index_rule(rule)
+        if self.algorithm is tools.exhaustive:
+            self.rules.sort(key=lambda rule: self.order[id(rule)])  # almost sorted, so it's nearly linear
+        return {'objects': len(self.decision_system), 'invalidated': invalidated, 'updated': updated,
+                'added': len(new_rules)}
+
+    def add_support(self, rule, object_index):
+        """Count object in support of rule."""
+        rule.support += 1
+        if self.algorithm is tools.lem2:
+            self.owned[id(rule)] |= 1 << object_index
+
+    def find_new_rules(self, affected):
+        """Return new rules for affected objects (bitset) by algorithm of rule set."""
+        rules = []
+        if self.algorithm is tools.exhaustive:
+            object_indexes = sorted({self.unique_objects[tuple(self.decision_system[object_index])]
+                                     for object_index in bitsets.iterate_bits(affected)})
+            tools.find_exhaustive_rules(self.decision_system, rules, self.attributes, self.index, object_indexes,
+                                        unique_objects=self.unique_objects)
+            return [rule for rule in rules if (tools.get_rule_key(rule), rule.decision) not in self.keys]
+
+        uncovered = {}  # decision -> bitset of objects that are not covered
+        for object_index in bitsets.iterate_bits(affected):
+            decision_object = self.decision_system[object_index]
+            if self.algorithm is tools.covering:
+                if not self.is_covered(decision_object) and not is_covered_by(rules, decision_object):
+                    rules.append(self.find_covering_rule(decision_object))
+            else:
+                covering_rules = [rule for rule in self.get_matched(decision_object)
+                                  if rule.decision == decision_object[-1]]
+                if covering_rules:
+                    self.add_support(covering_rules[0], object_index)  # object of removed rule goes to next rule
+                else:
+                    uncovered[decision_object[-1]] = uncovered.get(decision_object[-1], 0) | 1 << object_index
+        for decision, concept_objects in uncovered.items():
+            concept_rules = []
+            tools.find_concept_rules(self.decision_system, concept_rules, self.attributes, self.index, decision,
+                                     concept_objects)
+            self.set_owned(concept_rules, concept_objects)
+            rules.extend(concept_rules)
+        return rules
+
+    def find_covering_rule(self, decision_object):
+        """Return first consistent rule of the smallest scale for object (as in covering)."""
+        for combination in tools.all_combinations(self.attributes):
+            rule = classes.Rule(combination, decision_object, len(combination))
+            if tools.is_rule_inconsistent(rule, self.index):
+                tools.set_rule_support(rule, self.index)
+                return rule
+        raise ValueError("Decision system is inconsistent, objects with same attributes have other decisions.")
+
+
+def is_covered_by(rules, decision_object):
+    """Return: True if object fulfills at least one rule from rules with its decision; False if not."""
+    return any(rule.decision == decision_object[-1] and tools.has_object_fulfill_rule(rule, decision_object)
+               for rule in rules)
@@ -0,0 +1,267 @@
+"""Ingestion service: rules for decision system files that come to directory (or from queue of paths).
+
+Pipeline of asyncio tasks connected by bounded queues:
+    paths  -> parsers (threads, cli.load_file) -> jobs -> dispatchers (process pool, find_rules and outputs)
+Queues have limited size, so when pool is busy, parsed systems wait in jobs queue, parsers stop and new paths wait
+in paths queue (submit blocks), that is backpressure: memory doesn't grow with number of waiting files. Every job has
+metrics (waiting, parse, queue, induce and write times, latency from submit to outputs) appended to JSON lines file.
+Failed job (bad file or dead worker process) has error in its metrics. Pool that lost worker is replaced and its
+jobs are tried again once, every one in its own process, so only job that kills its worker fails.
+
+Example:
+    python ingest.py incoming --output-dir rules --algorithm lem2 --workers 4
+    python ingest.py incoming --output-dir rules --once  # files that are in directory now, then exit
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import fnmatch
+import json
+import os
+import sys
+import time
+
+import cli
+import tools
+from rule_set import RuleSet
+
+METRICS_FILE = 'metrics.jsonl'
+STOP = None  # end of queue
+
+
+# Job in worker process. <----------------------------------------------------------------------------------------------
+def induce_job(path, decision_system, names, algorithm, formats, output_dir):
+    """Return rules count, outputs and times of induction and writing of one parsed system (run in pool)."""
+    start = time.perf_counter()
+    rules = tools.find_rules(getattr(tools, algorithm), decision_system, rules=RuleSet(names))
+    induced = time.perf_counter()
+    outputs = cli.write_outputs(path, rules, decision_system, names, algorithm, formats, output_dir)
+    return {'rules': len(rules), 'outputs': outputs, 'induce': induced - start,
+            'write': time.perf_counter() - induced}
+
+
+def parse_file(path):
+    """Return (decision system, names) of text file (cli.load_file)."""
+    return cli.load_file(path)
+
+
+# Service. <------------------------------------------------------------------------------------------------------------
+class Ingestor:
+    """Asynchronous pipeline from paths of decision system files to rule outputs and metrics."""
+
+    def __init__(self, output_dir, algorithm='lem2', formats=('json',), workers=2, parsers=2, max_pending=None,
+                 metrics_path=None, log=None):
+        self.output_dir = output_dir
+        self.algorithm = algorithm
+        self.formats = tuple(formats)
+        self.workers = workers
+        self.parsers = parsers
+        self.max_pending = max_pending if max_pending is not None else 2 * workers  # parsed systems waiting for pool
+        self.metrics_path = metrics_path if metrics_path is not None else os.path.join(output_dir, METRICS_FILE)
+        self.log = log  # function called with metrics of every finished job
+        self.results = []  # metrics of finished jobs
+        self.paths = None
+        self.jobs = None
+        self.pool = None
+        self.tasks = []  # parsers
+        self.dispatchers = []
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Start pool, parsers and dispatchers."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.paths = asyncio.Queue(self.max_pending)
+        self.jobs = asyncio.Queue(self.max_pending)
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        self.tasks = [asyncio.ensure_future(self.parse()) for _ in range(self.parsers)]
+        self.dispatchers = [asyncio.ensure_future(self.dispatch()) for _ in range(self.workers)]
+        return self
+
+    async def submit(self, path):
+        """Add path to queue (waits while queue is full)."""
+        await self.paths.put((path, time.time(), time.perf_counter()))
+
+    async def close(self):
+        """Finish all submitted files and stop pool."""
+        for _ in self.tasks:
+            await self.paths.put(STOP)
+        await asyncio.gather(*self.tasks)
+        for _ in self.dispatchers:
+            await self.jobs.put(STOP)
+        await asyncio.gather(*self.dispatchers)
+        self.pool.shutdown()
+
+    async def parse(self):
+        """Parse files from paths queue in threads and put jobs in jobs queue."""
+        while True:
+            item = await self.paths.get()
+            if item is STOP:
+                return
+            path, submitted_at, submitted = item
+            metrics = {'path': path, 'algorithm': self.algorithm, 'submitted_at': submitted_at}
+            start = time.perf_counter()
+            metrics['wait'] = start - submitted
+            try:
+                decision_system, names = await asyncio.get_running_loop().run_in_executor(None, parse_file, path)
+            except Exception as error:  # one bad file doesn't stop parser
+                metrics['parse'] = time.perf_counter() - start
+                self.finish(metrics, submitted, error)
+                continue
+            metrics['parse'] = time.perf_counter() - start
+            metrics['objects'] = len(decision_system)
+            await self.jobs.put((metrics, submitted, time.perf_counter(), decision_system, names))
+
+    async def dispatch(self):
+        """Run jobs from jobs queue in process pool (one job at a time for every dispatcher)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.jobs.get()
+            if item is STOP:
+                return
+            metrics, submitted, queued, decision_system, names = item
+            metrics['queue'] = time.perf_counter() - queued
+            arguments = (metrics['path'], decision_system, names, self.algorithm, self.formats, self.output_dir)
+            pool = self.pool
+            try:
+                try:
+                    result = await loop.run_in_executor(pool, induce_job, *arguments)
+                except concurrent.futures.BrokenExecutor:
+                    # all running jobs of pool fail when one worker dies, so every job is tried again once, alone
+                    self.replace_pool(pool)
+                    metrics['retried'] = True
+                    result = await run_alone(induce_job, *arguments)
+            except Exception as error:  # one failed job doesn't stop dispatcher
+                self.finish(metrics, submitted, error)
+                continue
+            metrics.update(result)
+            self.finish(metrics, submitted)
+
+    def replace_pool(self, pool):
+        """Replace broken pool with new one (only once, though all its dispatchers see it broken)."""
+        if pool is self.pool:
+            self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+            pool.shutdown(wait=False)
+
+    def finish(self, metrics, submitted, error=None):
+        """Save metrics of finished (or failed) job."""
+        metrics['latency'] = time.perf_counter() - submitted
+        if error is not None:
+            metrics['error'] = '{}: {}'.format(type(error).__name__, error)
+        self.results.append(metrics)
+        with open(self.metrics_path, 'a') as output:
+            output.write(json.dumps(metrics) + '\n')
+        if self.log is not None:
+            self.log(metrics)
+
+
+async def run_alone(function, *arguments):
+    """Return result of function in its own worker process, so its death doesn't fail other jobs."""
+    pool = concurrent.futures.ProcessPoolExecutor(1)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, function, *arguments)
+    finally:
+        pool.shutdown(wait=False)
+
+
+# Sources of paths. <---------------------------------------------------------------------------------------------------
+async def run_paths(paths, output_dir, **options):
+    """Process files from paths and return list of metrics."""
+    async with Ingestor(output_dir, **options) as ingestor:
+        for path in paths:
+            await ingestor.submit(path)
+    return ingestor.results
+
+
+async def run_queue(queue, output_dir, **options):
+    """Process paths from asyncio queue until None is taken from it and return list of metrics."""
+    async with Ingestor(output_dir, **options) as ingestor:
+        while True:
+            path = await queue.get()
+            if path is None:
+                break
+            await ingestor.submit(path)
+    return ingestor.results
+
+
+async def watch_directory(directory, output_dir, pattern='*.txt', interval=1.0, once=False, stop=None, **options):
+    """Process files that appear (or change) in directory until stop event is set and return list of metrics.
+
+    File is submitted when its size and modification time are the same in two polls (it is not being written).
+    With once, files that are in directory at start are processed and function returns.
+    """
+    seen = {}  # path -> (size, mtime) of submitted version
+    candidates = {}  # path -> (size, mtime) in last poll
+    async with Ingestor(output_dir, **options) as ingestor:
+        while True:
+            for path in get_files(directory, pattern):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                version = (stat.st_size, stat.st_mtime_ns)
+                if seen.get(path) == version:
+                    continue
+                if once or candidates.get(path) == version:
+                    seen[path] = version
+                    candidates.pop(path, None)
+                    await ingestor.submit(path)
+                else:
+                    candidates[path] = version
+            if once or (stop is not None and stop.is_set()):
+                break
+            if stop is None:
+                await asyncio.sleep(interval)
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+    return ingestor.results
+
+
+def get_files(directory, pattern):
+    """Return sorted list of paths of files in directory that match pattern."""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if fnmatch.fnmatch(name, pattern) and os.path.isfile(os.path.join(directory, name)))
+
+
+def format_metrics(metrics):
+    """Return one line summary of metrics of job."""
+    if 'error' in metrics:
+        return '{}: failed after {:.3f}s ({})'.format(metrics['path'], metrics['latency'], metrics['error'])
+    return '{}: {} objects, {} rules, latency {:.3f}s (parse {:.3f}s, induce {:.3f}s, write {:.3f}s)'.format(
+        metrics['path'], metrics['objects'], metrics['rules'], metrics['latency'], metrics['parse'],
+        metrics['induce'], metrics['write'])
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Induce rules for decision system files that come to directory.")
+    parser.add_argument('directory', help="directory with decision system files")
+    parser.add_argument('-o', '--output-dir', required=True, help="directory for rule files and metrics")
+    parser.add_argument('-a', '--algorithm', choices=cli.ALGORITHMS, default='lem2')
+    parser.add_argument('-f', '--format', nargs='+', choices=cli.FORMATS, default=['json'], dest='formats')
+    parser.add_argument('-p', '--pattern', default='*.txt')
+    parser.add_argument('-w', '--workers', type=int, default=2, help="processes for induction")
+    parser.add_argument('--parsers', type=int, default=2, help="files parsed concurrently")
+    parser.add_argument('--max-pending', type=int, help="parsed files waiting for pool (default: 2 * workers)")
+    parser.add_argument('-i', '--interval', type=float, default=1.0, help="seconds between polls of directory")
+    parser.add_argument('--once', action='store_true', help="process files that are in directory now and exit")
+    options = parser.parse_args(arguments)
+
+    try:
+        asyncio.run(watch_directory(
+            options.directory, options.output_dir, options.pattern, options.interval, options.once,
+            algorithm=options.algorithm, formats=options.formats, workers=options.workers, parsers=options.parsers,
+            max_pending=options.max_pending, log=lambda metrics: print(format_metrics(metrics), flush=True)))
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
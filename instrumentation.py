@@ -0,0 +1,162 @@
+"""Opt-in profiling of induction algorithms from tools.py.
+
+Profiler replaces functions of tools module with wrappers that count and time calls, and puts back original
+functions when it is stopped, so there is no cost when profiling is off. Calls are grouped by function, scale of rule
+and concept (decision of rule, or of object for rows of discernibility matrix). Time of get_matrix is time of making
+every row. Algorithms call these functions by module names, so wrappers are used without any change of algorithms.
+Only calls in current process are profiled (not in workers of parallel backend and not in numpy backend).
+
+Example:
+    with Profiler() as profiler:
+        rules = tools.find_rules(tools.exhaustive, decision_system)
+    profiler.write_trace('trace.jsonl')
+"""
+import json
+import threading
+import time
+
+import tools
+
+FUNCTIONS = ('is_rule_inconsistent', 'is_descriptors_consistent', 'get_matrix', 'is_rule_found',
+             'set_rule_support', 'set_rule_support_and_eliminate', 'set_rule_support_lem')
+GENERATORS = ('get_matrix',)  # functions that return generators, every item is timed
+DESCRIPTOR_FUNCTIONS = ('is_descriptors_consistent',)  # functions with descriptors and decision instead of rule
+
+lock = threading.Lock()  # only one profiler can patch tools at once
+
+
+class Profiler:
+    """Counts and times of calls of tools functions for every (function, scale, concept)."""
+
+    def __init__(self, functions=FUNCTIONS, names=None):
+        self.functions = functions
+        self.names = names  # names of values of columns, concepts are decoded in records
+        self.counts = {}  # (function, scale, concept) -> [calls, seconds]
+        self.originals = {}  # name of function -> original function
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        """Replace functions of tools with counting wrappers."""
+        if not lock.acquire(blocking=False):
+            raise RuntimeError("Other profiler is already running.")
+        for name in self.functions:
+            function = getattr(tools, name)
+            self.originals[name] = function
+            if name in GENERATORS:
+                wrap = wrap_generator
+            elif name in DESCRIPTOR_FUNCTIONS:
+                wrap = wrap_descriptors_function
+            else:
+                wrap = wrap_function
+            setattr(tools, name, wrap(name, function, self.counts))
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self):
+        """Put back original functions of tools."""
+        if self.started is None:
+            return
+        self.elapsed += time.perf_counter() - self.started
+        self.started = None
+        for name, function in self.originals.items():
+            setattr(tools, name, function)
+        self.originals = {}
+        lock.release()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Results. <--------------------------------------------------------------------------------------------------------
+    def get_records(self):
+        """Return list of dictionaries: function, scale, concept, calls and seconds (sorted by time)."""
+        records = []
+        for (function, scale, concept), (calls, seconds) in self.counts.items():
+            if self.names is not None and concept is not None:
+                concept = self.names[-1][concept]
+            records.append({'function': function, 'scale': scale, 'concept': concept, 'calls': calls,
+                            'seconds': seconds})
+        records.sort(key=lambda record: record['seconds'], reverse=True)
+        return records
+
+    def get_summary(self):
+        """Return dictionary: function -> {'calls', 'seconds'} of all scales and concepts."""
+        summary = {}
+        for (function, _, _), (calls, seconds) in self.counts.items():
+            total = summary.setdefault(function, {'calls': 0, 'seconds': 0.0})
+            total['calls'] += calls
+            total['seconds'] += seconds
+        return summary
+
+    def format_summary(self):
+        """Generator for lines with calls and time of every function (share of time of profiled run)."""
+        summary = self.get_summary()
+        for function in sorted(summary, key=lambda name: summary[name]['seconds'], reverse=True):
+            calls, seconds = summary[function]['calls'], summary[function]['seconds']
+            share = seconds / self.elapsed * 100 if self.elapsed else 0.0
+            yield '{}: {} calls, {:.4f}s ({:.1f}%)'.format(function, calls, seconds, share)
+
+    def write_trace(self, trace, **fields):
+        """Append records to JSON lines file trace (fields are added to every line, e.g. path of system)."""
+        write_trace(trace, self.get_records(), elapsed=self.elapsed, **fields)
+
+
+def write_trace(trace, records, **fields):
+    """Append records (dictionaries) to JSON lines file trace, fields are added to every line."""
+    with open(trace, 'a') as output:
+        for record in records:
+            record = dict(fields, **record)
+            output.write(json.dumps(record) + '\n')
+
+
+# Wrappers. <-----------------------------------------------------------------------------------------------------------
+def add_call(counts, key, seconds):
+    count = counts.get(key)
+    if count is None:
+        counts[key] = [1, seconds]
+    else:
+        count[0] += 1
+        count[1] += seconds
+
+
+def wrap_function(name, function, counts):
+    """Return function that counts calls of function with rule as first argument."""
+    def wrapper(rule, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(rule, *args, **kwargs)
+        finally:
+            add_call(counts, (name, rule.scale, rule.decision), time.perf_counter() - start)
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def wrap_descriptors_function(name, function, counts):
+    """Return function that counts calls of function with descriptors and decision as first arguments."""
+    def wrapper(descriptors, decision, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(descriptors, decision, *args, **kwargs)
+        finally:
+            add_call(counts, (name, len(descriptors), decision), time.perf_counter() - start)
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def wrap_generator(name, function, counts):
+    """Return generator function that counts items (object index, row) of function with system as first argument."""
+    def wrapper(decision_system, *args, **kwargs):
+        items = function(decision_system, *args, **kwargs)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            add_call(counts, (name, None, decision_system[item[0]][-1]), time.perf_counter() - start)
+            yield item
+    wrapper.__wrapped__ = function
+    return wrapper
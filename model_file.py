@@ -0,0 +1,214 @@
+"""Binary file with encoded decision system, its symbolic names and rule set.
+
+File has header (magic, version, number of sections, checksum of section table), table of sections (tag, typecode,
+offset, size and CRC-32 of every section) and sections aligned to 8 bytes. Columns of system and columns of RuleSet
+are saved raw, so file is opened by memory map and arrays are views of it (nothing is parsed except small JSON
+sections). Sections:
+    META - JSON: numbers of rows and columns, scale table of rules and metadata given by user,
+    NAME - JSON: names of values of every column (position is code),
+    COL  - one section for every column of system (last is decision),
+    WGHT - weights of rows of WeightedSystem,
+    RMSK, RVAL, ROFF, RDEC, RSUP, RSCL - masks, values, offsets, decisions, supports and positions ordered by scale of
+           RuleSet (RATT with attribute of every value replaces RMSK when masks don't fit in 64 bits).
+"""
+import array
+import json
+import mmap
+import struct
+import zlib
+
+from rule_set import RuleSet
+from system_loader import ColumnSystem, align, get_typecode
+
+MAGIC = b'DSMODEL\0'
+VERSION = 1
+HEADER = struct.Struct('<8sHHII')  # magic, version, reserved, number of sections, CRC-32 of section table
+SECTION = struct.Struct('<4s4sQQI4x')  # tag, typecode (or b'json'), offset, size in bytes, CRC-32
+JSON = b'json'
+
+
+class ModelFile:
+    """Content of model file: system (ColumnSystem or None), names, rules (RuleSet or None) and metadata."""
+
+    def __init__(self, system, names, rules, metadata, buffer=None, views=()):
+        self.system = system
+        self.names = names
+        self.rules = rules
+        self.metadata = metadata
+        self.buffer = buffer  # memory map that arrays are views of (None if arrays are in memory)
+        self.views = list(views)
+
+    def close(self):
+        """Release memory map (system and rules can't be used after that)."""
+        if self.buffer is not None:
+            for view in self.views:
+                view.release()
+            self.buffer.close()
+            self.buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Saving. <-------------------------------------------------------------------------------------------------------------
+def get_columns(decision_system):
+    """Return list of compact columns of decision system (list of rows or ColumnSystem)."""
+    if isinstance(decision_system, ColumnSystem):
+        return decision_system.columns
+    return [array.array(get_typecode(max(column)), column) for column in zip(*decision_system)]
+
+
+def get_rule_sections(rules):
+    """Return (list of (tag, array) sections, scale table [scale, start, count]) of RuleSet."""
+    scale_table = []
+    positions = array.array('I')
+    for scale in rules.get_scales():
+        scale_table.append([scale, len(positions), rules.get_scale_length(scale)])
+        positions.extend(rules.scales[scale])
+
+    if isinstance(rules.masks, array.array):
+        masks = (b'RMSK', rules.masks)
+    else:
+        attributes = array.array('I')  # attribute of every value, masks are made again when file is loaded
+        for mask in rules.masks:
+            attributes.extend(attribute for attribute in range(mask.bit_length()) if mask >> attribute & 1)
+        masks = (b'RATT', attributes)
+    sections = [masks, (b'RVAL', rules.values), (b'ROFF', rules.offsets), (b'RDEC', rules.decisions),
+                (b'RSUP', rules.supports), (b'RSCL', positions)]
+    return sections, scale_table
+
+
+def save_model(path, decision_system=None, names=None, rules=None, metadata=None):
+    """Save encoded decision system, names of values and RuleSet (every part is optional) in model file."""
+    meta = {'metadata': metadata or {}}
+    sections = []  # (tag, JSON bytes or array)
+    if decision_system is not None:
+        columns = get_columns(decision_system)
+        meta['rows'] = len(columns[0]) if columns else 0
+        meta['columns'] = len(columns)
+        for column in columns:
+            sections.append((b'COL\0', column))
+        weights = getattr(decision_system, 'weights', None)
+        if weights is not None:
+            sections.append((b'WGHT', array.array('Q', weights)))
+    if rules is not None:
+        rule_sections, meta['scales'] = get_rule_sections(rules)
+        meta['rules'] = len(rules)
+        sections.extend(rule_sections)
+    if names is not None:
+        sections.insert(0, (b'NAME', json.dumps(names).encode('utf-8')))
+    sections.insert(0, (b'META', json.dumps(meta).encode('utf-8')))
+
+    table = []
+    offset = HEADER.size + SECTION.size * len(sections)
+    data = []
+    for tag, content in sections:
+        if isinstance(content, bytes):
+            typecode = JSON
+        else:
+            typecode = (content.typecode if hasattr(content, 'typecode') else content.format).encode('ascii')
+            content = memoryview(content).cast('B')
+        offset = align(offset)
+        table.append(SECTION.pack(tag, typecode, offset, len(content), zlib.crc32(content)))
+        data.append((offset, content))
+        offset += len(content)
+
+    table = b''.join(table)
+    with open(path, 'wb') as output:
+        output.write(HEADER.pack(MAGIC, VERSION, 0, len(sections), zlib.crc32(table)))
+        output.write(table)
+        for offset, content in data:
+            output.write(b'\0' * (offset - output.tell()))
+            output.write(content)
+
+
+# Loading. <------------------------------------------------------------------------------------------------------------
+def read_sections(buffer, path):
+    """Return list of (tag, typecode, offset, size, crc) from header and section table of model file."""
+    if len(buffer) < HEADER.size:
+        raise ValueError("{} is not a model file.".format(path))
+    magic, version, _, number_of_sections, table_crc = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("{} is not a model file.".format(path))
+    if version > VERSION:
+        raise ValueError("{} has version {} of model format, supported version is {}.".format(path, version,
+                                                                                              VERSION))
+    table_end = HEADER.size + SECTION.size * number_of_sections
+    if len(buffer) < table_end or zlib.crc32(buffer[HEADER.size:table_end]) != table_crc:
+        raise ValueError("{} is damaged: wrong checksum of section table.".format(path))
+    sections = [SECTION.unpack_from(buffer, HEADER.size + SECTION.size * number)
+                for number in range(number_of_sections)]
+    for tag, _, offset, size, _ in sections:
+        if offset + size > len(buffer):
+            raise ValueError("{} is damaged: section {} is truncated.".format(path, tag.rstrip(b'\0').decode('ascii')))
+    return sections
+
+
+def load_model(path, verify=True):
+    """Return ModelFile with arrays mapped from file saved by save_model (verify checks CRC-32 of all sections)."""
+    with open(path, 'rb') as source:
+        buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+    views = []
+    try:
+        sections = read_sections(view, path)
+        columns = []
+        parts = {}  # tag -> decoded JSON or array view
+        for tag, typecode, offset, size, crc in sections:
+            content = view[offset:offset + size]
+            if verify and zlib.crc32(content) != crc:
+                content.release()
+                raise ValueError("{} is damaged: wrong checksum of section {}.".format(
+                    path, tag.rstrip(b'\0').decode('ascii')))
+            if typecode == JSON:
+                parts[tag] = json.loads(bytes(content).decode('utf-8'))
+                content.release()
+                continue
+            content = content.cast(typecode.rstrip(b'\0').decode('ascii'))
+            views.append(content)
+            if tag == b'COL\0':
+                columns.append(content)
+            else:
+                parts[tag] = content
+    except Exception:
+        for content in views:
+            content.release()
+        view.release()
+        buffer.close()
+        raise
+    view.release()
+
+    meta = parts[b'META']
+    names = parts.get(b'NAME')
+    system = ColumnSystem(columns, names) if 'columns' in meta else None
+    if system is not None and b'WGHT' in parts:
+        system.weights = parts[b'WGHT']  # weights of unique rows, used by tools.get_index
+    rules = get_rule_set(parts, meta, names) if 'rules' in meta else None
+    if rules is not None:
+        views.extend(rules.scales.values())
+    return ModelFile(system, names, rules, meta['metadata'], buffer, views)
+
+
+def get_rule_set(parts, meta, names):
+    """Return read-only RuleSet with columns from sections of model file."""
+    rules = RuleSet(names)
+    rules.values = parts[b'RVAL']
+    rules.offsets = parts[b'ROFF']
+    rules.decisions = parts[b'RDEC']
+    rules.supports = parts[b'RSUP']
+    if b'RMSK' in parts:
+        rules.masks = parts[b'RMSK']
+    else:
+        attributes = parts[b'RATT']
+        rules.masks = []
+        for position in range(len(rules.decisions)):
+            mask = 0
+            for attribute in attributes[rules.offsets[position]:rules.offsets[position + 1]]:
+                mask |= 1 << attribute
+            rules.masks.append(mask)
+    positions = parts[b'RSCL']
+    rules.scales = {scale: positions[start:start + count] for scale, start, count in meta['scales']}
+    return rules
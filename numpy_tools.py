@@ -1,134 +1,175 @@
-import copy
 import numpy as np
 import itertools as it
 import classes
+from encoder import Encoder
 
 
-def get_system_objects(system_file):
-    """Return numpy array with uint16 that represent Rule Based System and dictionary to encode true values."""
+# Functions for read rule based system and transform symbols to integers. <---------------------------------------------
+def get_system_objects(system_file, encoder=None):
+    """Return numpy array that represent Rule Based System (with elimination column) and list of names per column."""
     system_file.seek(0)  # return to beginning of file
     objects = []
-    unique_values = {}
+    encoder = encoder if encoder is not None else Encoder()
     for line in system_file:
         if line.strip() != '':  # true if line isn't empty
-            objects.append(get_object(line, unique_values))  # append Decision Object to list of objects
-    return np.array(objects, dtype=np.uint16), dict(zip(unique_values.values(), unique_values.keys()))
-
-
-def get_object(line, unique_values):
-    """Transform string values to uint16s and return array with uint16 values"""
-    decision_object = []
-    line = line.rstrip().split(' ')  # remove from end all white chars and split row by ' '
-    for value in line:
-        if value not in unique_values:
-            unique_values[value] = get_object.counter
-            get_object.counter += 1
-        decision_object.append(unique_values.get(value))
-    decision_object.append(0)
-    return decision_object
+            objects.append(get_object(line, encoder))  # append Decision Object to list of objects
+    return np.array(objects, dtype=get_dtype(encoder.get_max_code())), encoder.names
 
-get_object.counter = 0
-
-
-def covering(decision_system):
-    number_of_attributes = len(decision_system[0]) - 2  # number of attributes
-    attributes_ids = [att for att in range(number_of_attributes)]  # list of attributes ids
-    rules = []
-    for scale in range(number_of_attributes):
-        scale += 1
-        combination_of_attributes = list(it.combinations(attributes_ids, scale))
-        for decision_object in iterate(decision_system):
-            for combination in combination_of_attributes:
-                descriptors = get_descriptors(decision_object, combination)
-                decision = decision_object[-2]
-                if is_rule_inconsistent(descriptors, decision, decision_system):
-                    rule = classes.Rule(descriptors, decision, scale)
-                    calculate_support_and_eliminate(rule, decision_system)
-                    rules.append(rule)
-                    break
-            is_this_the_end(decision_system)
-    return rules
-
-
-def iterate(decision_system):
-    for decision_object in decision_system:
-        if decision_object[-1] == 1:
-            continue
-        else:
-            yield decision_object
-
-
-def get_descriptors(decision_object, attributes):
-    descriptors = []
-    for attribute in attributes:
-        descriptors.append([attribute, decision_object[attribute]])
-    return descriptors
 
+def get_object(line, encoder):
+    """Transform string values to codes and return list with them and elimination flag."""
+    decision_object = encoder.encode_line(line)
+    decision_object.append(0)
+    return decision_object
 
-def has_object_fulfill_rule(descriptors, decision_object):
-    """Return true if fulfill; return false if not"""
-    for descriptor in descriptors:
-        if descriptor[1] != decision_object[descriptor[0]]:
-            return False
-    else:
-        return True
 
+def get_dtype(max_code):
+    """Return smallest unsigned dtype for codes (at least uint16)."""
+    return np.uint16 if max_code <= np.iinfo(np.uint16).max else np.min_scalar_type(max_code)
 
-def is_rule_inconsistent(descriptors, decision, objects):
-    for decision_object in objects:
-        if decision != decision_object[-2] and has_object_fulfill_rule(descriptors, decision_object):
-            return False
-    else:
-        return True
 
-def has_object_fulfill_rule_old(descriptors, decision_object):
-    """Return true if fulfill; return false if not"""
-    matrix = np.fromiter((fulfill_condition(descriptor, decision_object) for descriptor in descriptors),
-                         dtype=np.bool)
+def get_system_array(decision_system):
+    """Return numpy array (with elimination column) made from decision system in tools.py format."""
+    max_code = max((max(column) for column in zip(*decision_system)), default=0)
+    objects = np.zeros((len(decision_system), len(decision_system[0]) + 1), dtype=get_dtype(max_code))
+    objects[:, :-1] = decision_system
+    return objects
 
-    if np.any(matrix == False):
-        return False
-    else:
-        return True
 
+# Base function for all algorithms. <-----------------------------------------------------------------------------------
+def find_rules(algorithm, decision_system, attributes=None):
+    """Return rules calculated by function from argument (with attributes from list, all if None)."""
+    rules = []  # all rules from current algorithm
+    if attributes is None:
+        number_of_attributes = decision_system.shape[1] - 2  # number of attributes
+        attributes = [attribute_index for attribute_index in range(number_of_attributes)]  # list of attributes ids
 
-def fulfill_condition(descriptor, decision_object):
-    if descriptor[1] == decision_object[descriptor[0]]:
-        return True
-    else:
-        return False
+    algorithm(decision_system, rules, list(attributes))
+    return rules
 
 
-def is_rule_inconsistent_old(descriptors, decision, objects):
-    """Return true if inconsistent; return false if not"""
-    matrix = np.fromiter((inconsistent_condition(decision_object, descriptors, decision)
-                          for decision_object in objects), dtype=np.bool)
+def get_rule(combination, decision_system, index, scale):
+    """Return rule with descriptors of object from index (values are python ints)."""
+    return classes.Rule(combination, decision_system[index, :-1].tolist(), scale)
 
-    if np.any(matrix == False):
-        return False
-    else:
-        return True
 
+# Covering base function and support functions. <-----------------------------------------------------------------------
+def covering(decision_system, rules, attributes):
+    """Calculate rules by sequential covering."""
+    decision_system[:, -1] = 0  # no object is eliminated
+    decisions = decision_system[:, -2]
 
-def inconsistent_condition(decision_object, descriptors, decision):
-    if decision != decision_object[-1] and has_object_fulfill_rule(descriptors, decision_object):
-        return False
-    else:
-        return True
+    for scale in range(len(attributes)):
+        scale += 1
+        combination_of_attributes = [list(combination) for combination in it.combinations(attributes, scale)]
+        for index in range(decision_system.shape[0]):
+            if decision_system[index, -1] == 1:
+                continue
+            equal = decision_system[:, :-2] == decision_system[index, :-2]  # descriptors fulfilled by every object
+            other = decisions != decisions[index]
+            for combination in combination_of_attributes:
+                coverage = equal[:, combination].all(axis=1)
+                if not np.any(coverage & other):
+                    rule = get_rule(combination, decision_system, index, scale)
+                    calculate_support_and_eliminate(rule, coverage & ~other, decision_system)
+                    rules.append(rule)
+                    break
+            if is_this_the_end(decision_system):
+                return
 
 
-def calculate_support_and_eliminate(rule, objects):
+def calculate_support_and_eliminate(rule, supporting, decision_system):
     """Calculate support of rule and eliminate supporting objects"""
-    support = 0
-    for decision_object in objects:
-        if rule.decision == decision_object[-2] and has_object_fulfill_rule(rule.descriptors, decision_object):
-            decision_object[-1] = 1
-            support += 1
-    rule.support = support
+    decision_system[supporting, -1] = 1
+    rule.support = int(np.count_nonzero(supporting))
 
 
 def is_this_the_end(objects):
-    if 0 in objects[:, -1]:
-        return False
-    else:
-        return True
+    """Return: True if all objects was used; False if find not covered object."""
+    return bool(np.all(objects[:, -1] == 1))
+
+
+# Exhaustive base function and support functions. <---------------------------------------------------------------------
+def exhaustive(decision_system, rules, attributes):
+    """Calculate rules by exhaustive algorithm (with indistinguishable matrix computed row by row)."""
+    number_of_attributes = decision_system.shape[1] - 2
+    decisions = decision_system[:, -2]
+    rules_masks = np.zeros((0, number_of_attributes), dtype=bool)  # attributes used by every rule
+    rules_values = np.zeros((0, number_of_attributes), dtype=decision_system.dtype)  # values of every rule
+
+    for index in range(decision_system.shape[0]):
+        decision_object = decision_system[index, :-2]
+        equal = decision_system[:, :-2] == decision_object
+        other = decisions != decisions[index]
+        row = equal[other]  # row of indistinguishable matrix (cells as boolean masks of attributes)
+        found = rules_masks[np.all(~rules_masks | (rules_values == decision_object), axis=1)]
+        new_masks = []
+        for combination in all_combinations(attributes):
+            if np.any(row[:, combination].all(axis=1)):
+                continue  # combination is in row so rule is inconsistent
+            combination_mask = np.zeros(number_of_attributes, dtype=bool)
+            combination_mask[combination] = True
+            if np.any(np.all(~found | combination_mask, axis=1)):
+                continue  # rule contains already added rule
+            rule = get_rule(combination, decision_system, index, len(combination))
+            rule.support = int(np.count_nonzero(equal[:, combination].all(axis=1) & ~other))
+            rules.append(rule)
+            found = np.vstack((found, combination_mask))
+            new_masks.append(combination_mask)
+        if new_masks:
+            rules_masks = np.vstack([rules_masks] + new_masks)
+            rules_values = np.vstack([rules_values] + [decision_object] * len(new_masks))
+    return rules
+
+
+def all_combinations(attributes):
+    """Generator for all picks combinations."""
+    for scale in range(len(attributes)):
+        for combination in it.combinations(attributes, scale + 1):
+            yield list(combination)
+
+
+# LEM2 base function and support functions. <---------------------------------------------------------------------------
+def lem2(decision_system, rules, attributes):
+    """Calculate rules by LEM2 algorithm (Learn from Examples by Modules)."""
+    decisions = decision_system[:, -2]
+    coverages = {attribute: np.bincount(decision_system[:, attribute]) for attribute in attributes}  # value counts
+    _, first_indexes = np.unique(decisions, return_index=True)
+    for decision in decisions[np.sort(first_indexes)]:
+        concept_objects = decisions == decision  # mask of not covered objects from concept
+        other = ~concept_objects
+        while np.any(concept_objects):
+            descriptors = {}
+            mode_objects = concept_objects  # not covered concept objects that fulfill descriptors
+            coverage = other  # objects from other concepts that fulfill descriptors
+            tmp_attributes = attributes[:]
+            while not descriptors or np.any(coverage):
+                if not tmp_attributes:
+                    raise ValueError("Decision system is inconsistent, objects with same attributes have other "
+                                     "decisions.")
+                attribute, value = get_descriptor(decision_system, mode_objects, tmp_attributes, coverages)
+                descriptors[attribute] = value
+                tmp_attributes.remove(attribute)
+                column = decision_system[:, attribute] == value
+                mode_objects = mode_objects & column
+                coverage = coverage & column
+            rule = get_rule(list(descriptors), decision_system, int(np.argmax(mode_objects)), len(descriptors))
+            rule.support = int(np.count_nonzero(mode_objects))
+            concept_objects = concept_objects & ~mode_objects
+            rules.append(rule)
+
+
+def get_descriptor(decision_system, mode_objects, attributes, coverages):
+    """Return descriptor (attribute, value) with the most mode objects (ties go to descriptor that covers fewer
+    objects, then to smaller value)."""
+    mode_descriptor = None
+    best = None
+    for attribute in attributes:
+        counts = np.bincount(decision_system[mode_objects, attribute], minlength=len(coverages[attribute]))
+        candidates = np.flatnonzero(counts == counts.max())
+        value = candidates[np.argmin(coverages[attribute][candidates])]
+        key = (counts[value], -coverages[attribute][value])
+        if best is None or key > best:
+            best = key
+            mode_descriptor = (attribute, int(value))
+    return mode_descriptor
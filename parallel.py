@@ -0,0 +1,123 @@
+"""Parallel rule induction in pool of processes.
+
+Encoded decision system is copied once to shared memory (one compact column after another) and every worker maps it
+as ColumnSystem, so tasks send only small arguments. LEM2 is divided by decision concepts and exhaustive by shards of
+unique objects. Results are merged in order of tasks, so rules are the same (and in the same order) as in serial run.
+Covering eliminates objects sequentially, so it is always calculated in one process.
+"""
+import array
+import concurrent.futures
+from multiprocessing import shared_memory
+
+import tools
+from system_loader import ColumnSystem, get_typecode, align
+
+SHARDS_PER_WORKER = 4  # more shards than workers, so slow shards don't stop the pool
+
+worker = {}  # state of worker process: shared memory, decision system, index and attributes
+
+
+# Shared memory. <------------------------------------------------------------------------------------------------------
+def share_system(decision_system):
+    """Return shared memory with columns of decision system and layout [(typecode, offset)] to map them."""
+    columns = [array.array(get_typecode(max(column)), column) for column in zip(*decision_system)]
+    layout = []
+    size = 0
+    for column in columns:
+        offset = align(size)
+        layout.append((column.typecode, offset))
+        size = offset + column.itemsize * len(column)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for column, (_, offset) in zip(columns, layout):
+        memory.buf[offset:offset + column.itemsize * len(column)] = memoryview(column).cast('B')
+    return memory, layout
+
+
+def map_system(buffer, layout, number_of_objects):
+    """Return ColumnSystem with columns mapped from shared buffer."""
+    view = memoryview(buffer)
+    columns = []
+    for typecode, offset in layout:
+        size = number_of_objects * array.array(typecode).itemsize
+        columns.append(view[offset:offset + size].cast(typecode))
+    return ColumnSystem(columns, None)
+
+
+def init_worker(name, layout, number_of_objects, weights=None, attributes=None):
+    """Map shared decision system and build its index (once for every worker, weights of WeightedSystem)."""
+    memory = shared_memory.SharedMemory(name=name)
+    decision_system = map_system(memory.buf, layout, number_of_objects)
+    worker['memory'] = memory
+    worker['decision_system'] = decision_system
+    worker['index'] = tools.get_index(decision_system, weights)
+    worker['attributes'] = list(attributes if attributes is not None else range(decision_system.number_of_attributes))
+
+
+# Tasks. <--------------------------------------------------------------------------------------------------------------
+def lem2_task(decision):
+    """Return LEM2 rules of one decision concept."""
+    rules = []
+    tools.find_concept_rules(worker['decision_system'], rules, worker['attributes'], worker['index'], decision)
+    return rules
+
+
+def exhaustive_task(object_indexes):
+    """Return exhaustive rules of shard of unique objects."""
+    rules = []
+    tools.find_exhaustive_rules(worker['decision_system'], rules, worker['attributes'], worker['index'],
+                                object_indexes)
+    return rules
+
+
+def get_shards(object_indexes, number_of_shards):
+    """Return list of contiguous shards of object indexes."""
+    shard_size = max(1, -(-len(object_indexes) // number_of_shards))
+    return [object_indexes[start:start + shard_size] for start in range(0, len(object_indexes), shard_size)]
+
+
+# Base function. <------------------------------------------------------------------------------------------------------
+def find_rules(algorithm, decision_system, workers, progress=None, attributes=None):
+    """Return rules calculated by algorithm in pool of workers processes (progress is called after every task)."""
+    if algorithm is tools.lem2:
+        task = lem2_task
+        arguments = tools.get_unique(decision_object[-1] for decision_object in decision_system)
+    elif algorithm is tools.exhaustive:
+        task = exhaustive_task
+        object_indexes = list(tools.get_unique_objects(decision_system).values())
+        arguments = get_shards(object_indexes, workers * SHARDS_PER_WORKER)
+    else:
+        return tools.find_rules(algorithm, decision_system, progress=progress, attributes=attributes)
+
+    memory, layout = share_system(decision_system)
+    try:
+        pool = concurrent.futures.ProcessPoolExecutor(workers, initializer=init_worker,
+                                                      initargs=(memory.name, layout, len(decision_system),
+                                                                getattr(decision_system, 'weights', None), attributes))
+        try:
+            results = []
+            for result in pool.map(task, arguments):
+                results.append(result)
+                tools.report(progress, len(results), len(arguments))
+        finally:
+            pool.shutdown(cancel_futures=True)  # tasks that didn't start are dropped if progress cancelled
+    finally:
+        memory.close()
+        memory.unlink()
+    return merge_rules(results)
+
+
+def merge_rules(results):
+    """Return rules from results of tasks (in order of tasks) without duplicates.
+
+    Workers see whole decision system, so supports calculated by them are already supports in whole system.
+    """
+    rules = []
+    keys = set()
+    for task_rules in results:
+        for rule in task_rules:
+            key = tools.get_rule_key(rule), rule.decision
+            if key not in keys:
+                keys.add(key)
+                rules.append(rule)
+    return rules
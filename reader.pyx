@@ -0,0 +1,92 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+"""Compiled kernels of rule induction (optional, tools.py uses its pure Python functions when module isn't built).
+
+Table is typed memoryview of rows of encoded decision system (unsigned int codes, decision is last column) made by
+tools.get_table. Cells are bitmasks of attributes in C integers, so rows of discernibility matrix are computed here
+only for systems with at most MAX_ATTRIBUTES attributes.
+
+Build:
+    python setup.py build_ext --inplace
+"""
+from libc.stdlib cimport free, malloc, qsort
+
+cdef enum:
+    LIMIT = 64  # bits of cell_t
+
+MAX_ATTRIBUTES = LIMIT
+
+ctypedef unsigned long long cell_t
+
+
+def is_consistent(const unsigned int[:, ::1] table, dict descriptors, unsigned int decision):
+    """Return: True if no object from other decision fulfill descriptors (dictionary attribute -> value); False if one
+    does."""
+    cdef unsigned int attributes[LIMIT]
+    cdef unsigned int values[LIMIT]
+    cdef Py_ssize_t row, index, count = 0, width = table.shape[1] - 1
+    if len(descriptors) > LIMIT:
+        raise ValueError("Rule has more than {} descriptors.".format(LIMIT))
+    for key, value in descriptors.items():
+        attributes[count] = key
+        values[count] = value
+        count += 1
+    for row in range(table.shape[0]):
+        if table[row, width] == decision:
+            continue
+        for index in range(count):
+            if table[row, attributes[index]] != values[index]:
+                break
+        else:
+            return False
+    return True
+
+
+def get_row(const unsigned int[:, ::1] table, Py_ssize_t row):
+    """Return row of discernibility matrix of row of table: minimal cells against rows of other decision."""
+    cdef Py_ssize_t other, index, count = 0, kept = 0, width = table.shape[1] - 1
+    cdef unsigned int decision = table[row, width]
+    cdef cell_t cell
+    cdef cell_t *cells = <cell_t *> malloc(max(table.shape[0], 1) * sizeof(cell_t))
+    if cells == NULL:
+        raise MemoryError()
+    try:
+        for other in range(table.shape[0]):
+            if table[other, width] != decision:
+                cell = 0
+                for index in range(width):
+                    if table[row, index] != table[other, index]:
+                        cell |= (<cell_t> 1) << index
+                cells[count] = cell
+                count += 1
+        qsort(cells, count, sizeof(cell_t), compare_cells)  # by number of attributes, so subsets come first
+        for other in range(count):
+            cell = cells[other]
+            if other and cell == cells[other - 1]:
+                continue
+            for index in range(kept):
+                if cell & cells[index] == cells[index]:
+                    break
+            else:
+                cells[kept] = cell  # kept < other, so cells that are still compared aren't overwritten
+                kept += 1
+        return [cells[index] for index in range(kept)]
+    finally:
+        free(cells)
+
+
+cdef int popcount(cell_t cell) noexcept nogil:
+    cdef int count = 0
+    while cell:
+        cell &= cell - 1
+        count += 1
+    return count
+
+
+cdef int compare_cells(const void *first, const void *second) noexcept nogil:
+    """Order of cells: number of attributes, then value."""
+    cdef cell_t a = (<const cell_t *> first)[0]
+    cdef cell_t b = (<const cell_t *> second)[0]
+    cdef int difference = popcount(a) - popcount(b)
+    if difference:
+        return difference
+    return (a > b) - (a < b)
@@ -0,0 +1,168 @@
+"""Core and reducts of decision system (rough sets) that shrink attribute space of rule search.
+
+Cells of discernibility matrix are bitmasks of attributes that discern pair of objects with other decisions (cells
+that are supersets of other cells are absorbed). Set of attributes discerns objects as well as all attributes when it
+has common attribute with every cell, reduct is such set that is minimal. Core are attributes of one-attribute cells,
+they are in every reduct. Objects with same attributes and other decisions (empty cells) can't be discerned by any
+attributes and are skipped.
+
+Example:
+    python reducts.py system.txt --algorithm covering --method exact
+"""
+import argparse
+import sys
+import time
+
+import bitsets
+import tools
+
+METHODS = ('greedy', 'exact')
+
+
+def get_cells(decision_system):
+    """Return list of absorbed cells of discernibility matrix of decision system."""
+    cells = set()
+    for _, row in tools.get_matrix(decision_system):
+        cells.update(row)
+    cells.discard(0)
+    return tools.absorb_cells(cells)
+
+
+def get_core(cells):
+    """Return sorted list of core attributes."""
+    return sorted(bitsets.lowest_bit(cell) for cell in cells if bitsets.popcount(cell) == 1)
+
+
+def is_reduct(mask, cells):
+    """Return: True if attributes from mask discern all cells (mask is at least superset of reduct); False if not."""
+    for cell in cells:
+        if not cell & mask:
+            return False
+    return True
+
+
+def get_greedy_reduct(cells):
+    """Return sorted list of attributes of reduct: core and then attributes that discern the most not discerned cells
+    (ties go to smaller attribute), redundant attributes are removed at the end."""
+    core = tools.get_attributes_mask(get_core(cells))
+    mask = core
+    remaining = [cell for cell in cells if not cell & mask]
+    while remaining:
+        counts = {}
+        for cell in remaining:
+            for attribute in bitsets.iterate_bits(cell):
+                counts[attribute] = counts.get(attribute, 0) + 1
+        best = max(sorted(counts), key=counts.get)
+        mask |= 1 << best
+        remaining = [cell for cell in remaining if not cell >> best & 1]
+
+    for attribute in sorted(bitsets.iterate_bits(mask & ~core), reverse=True):
+        if is_reduct(mask & ~(1 << attribute), cells):
+            mask &= ~(1 << attribute)
+    return list(bitsets.iterate_bits(mask))
+
+
+def get_exact_reduct(cells):
+    """Return sorted list of attributes of reduct with the smallest number of attributes (branch and bound)."""
+    best = [tools.get_attributes_mask(get_greedy_reduct(cells))]  # the best reduct found (greedy is upper bound)
+    core = tools.get_attributes_mask(get_core(cells))
+    search_reduct(core, 0, [cell for cell in cells if not cell & core], best)
+    return list(bitsets.iterate_bits(best[0]))
+
+
+def search_reduct(mask, excluded, remaining, best):
+    """Find smaller reduct than best[0] that contains mask and has no attributes from excluded mask."""
+    size = bitsets.popcount(mask)
+    if not remaining:
+        if size < bitsets.popcount(best[0]):
+            best[0] = mask
+        return
+    if size + get_lower_bound(remaining) >= bitsets.popcount(best[0]):
+        return
+    cell = min(remaining, key=bitsets.popcount)  # the smallest branching
+    for attribute in bitsets.iterate_bits(cell):
+        bit = 1 << attribute
+        rest = [other & ~excluded for other in remaining if not other & bit]
+        if all(rest):  # every cell can still be discerned
+            search_reduct(mask | bit, excluded, rest, best)
+        excluded |= bit
+        remaining = [other & ~bit for other in remaining]
+
+
+def get_lower_bound(cells):
+    """Return number of pairwise disjoint cells (every reduct needs one attribute from each of them)."""
+    used = 0
+    count = 0
+    for cell in sorted(cells, key=bitsets.popcount):
+        if not cell & used:
+            used |= cell
+            count += 1
+    return count
+
+
+def get_reduct(decision_system, method='greedy', cells=None):
+    """Return sorted list of attributes of reduct found by method ('greedy' or 'exact') for rule search.
+
+    Reduct of system with one decision is empty, but rules need at least one descriptor, so first attribute is used.
+    """
+    if method not in METHODS:
+        raise ValueError("Unknown method of reduct: {}".format(method))
+    if cells is None:
+        cells = get_cells(decision_system)
+    reduct = get_greedy_reduct(cells) if method == 'greedy' else get_exact_reduct(cells)
+    if not reduct and len(decision_system) and len(decision_system[0]) > 1:
+        reduct = [0]
+    return reduct
+
+
+# Comparison with all attributes. <-------------------------------------------------------------------------------------
+def compare(algorithm, decision_system, reduct, **options):
+    """Return times of rule search with all attributes and with reduct, speed-up and differences of rules."""
+    start = time.perf_counter()
+    full_rules = tools.find_rules(algorithm, decision_system, **options)
+    full_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    reduct_rules = tools.find_rules(algorithm, decision_system, attributes=reduct, **options)
+    reduct_seconds = time.perf_counter() - start
+
+    full_keys = {(tools.get_rule_key(rule), rule.decision) for rule in full_rules}
+    reduct_keys = {(tools.get_rule_key(rule), rule.decision) for rule in reduct_rules}
+    return {'reduct': list(reduct), 'full_seconds': full_seconds, 'reduct_seconds': reduct_seconds,
+            'speed_up': full_seconds / reduct_seconds if reduct_seconds else float('inf'),
+            'full_rules': len(full_rules), 'reduct_rules': len(reduct_rules),
+            'common_rules': len(full_keys & reduct_keys), 'only_full': len(full_keys - reduct_keys),
+            'only_reduct': len(reduct_keys - full_keys)}
+
+
+def format_comparison(comparison):
+    """Generator for lines of description of comparison."""
+    yield 'rules with all attributes: {full_rules} in {full_seconds:.4f}s'.format(**comparison)
+    yield 'rules with reduct: {reduct_rules} in {reduct_seconds:.4f}s (speed-up {speed_up:.2f}x)'.format(
+        **comparison)
+    yield 'common rules: {common_rules}, only with all attributes: {only_full}, only with reduct: {only_reduct}'.format(
+        **comparison)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Find core and reduct of decision system and compare rules.")
+    parser.add_argument('system', help="decision system file")
+    parser.add_argument('-a', '--algorithm', choices=('covering', 'exhaustive', 'lem2'), default='covering')
+    parser.add_argument('-m', '--method', choices=METHODS, default='greedy')
+    options = parser.parse_args(arguments)
+
+    with open(options.system) as file:
+        decision_system, _ = tools.get_system_objects(file)
+    start = time.perf_counter()
+    cells = get_cells(decision_system)
+    reduct = get_reduct(decision_system, options.method, cells)
+    print('core: {}'.format([attribute + 1 for attribute in get_core(cells)]))
+    print('reduct ({}): {} of {} attributes, found in {:.4f}s'.format(
+        options.method, [attribute + 1 for attribute in reduct], len(decision_system[0]) - 1,
+        time.perf_counter() - start))
+    for line in format_comparison(compare(getattr(tools, options.algorithm), decision_system, reduct)):
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
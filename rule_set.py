@@ -0,0 +1,146 @@
+"""Compact storage of encoded rules.
+
+RuleSet keeps rules in columns: attributes mask of every rule, values of descriptors of all rules one after another
+(offsets show where values of rule start), decision and support columns, and index of rule positions for every
+scale. Rules are encoded (integer codes of values), names of values are used only when rule is displayed or exported,
+so rules don't have to be renamed. RuleSet has append like list, so algorithms can add rules directly to it.
+"""
+import array
+
+import bitsets
+import classes
+
+
+class CompactRule:
+    """Rule with descriptors as attributes mask and tuple of values (in order of attributes)."""
+
+    __slots__ = ('mask', 'values', 'decision', 'support')
+
+    def __init__(self, mask, values, decision, support=0):
+        self.mask = mask
+        self.values = values
+        self.decision = decision
+        self.support = support
+
+    @property
+    def attributes(self):
+        """List of attributes of descriptors."""
+        return list(bitsets.iterate_bits(self.mask))
+
+    @property
+    def descriptors(self):
+        """Dictionary attribute -> value (new dictionary, made only when asked for)."""
+        return dict(zip(bitsets.iterate_bits(self.mask), self.values))
+
+    @property
+    def scale(self):
+        return len(self.values)
+
+    def to_rule(self):
+        """Return classes.Rule with same descriptors, decision and support."""
+        decision_object = self.descriptors
+        decision_object[-1] = self.decision
+        rule = classes.Rule(self.attributes, decision_object, self.scale)
+        rule.support = self.support
+        return rule
+
+    def print_rule(self):
+        return self.to_rule().print_rule()
+
+
+class RuleSet:
+    """Columns of encoded rules with index of scales; names (lists of values of every column) decode rules."""
+
+    def __init__(self, names=None):
+        self.names = names
+        self.masks = array.array('Q')  # becomes list when there are more than 64 attributes
+        self.values = array.array('I')
+        self.offsets = array.array('Q', [0])  # values of rule i are values[offsets[i]:offsets[i + 1]]
+        self.decisions = array.array('I')
+        self.supports = array.array('Q')
+        self.scales = {}  # scale -> positions of rules
+
+    @classmethod
+    def from_rules(cls, rules, names=None):
+        """Return RuleSet with encoded rules (objects with descriptors, decision and support)."""
+        rule_set = cls(names)
+        rule_set.extend(rules)
+        return rule_set
+
+    def __len__(self):
+        return len(self.decisions)
+
+    def __getitem__(self, position):
+        """Return encoded rule from position."""
+        if position < 0:
+            position += len(self)
+        values = tuple(self.values[self.offsets[position]:self.offsets[position + 1]])
+        return CompactRule(self.masks[position], values, self.decisions[position], self.supports[position])
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def append(self, rule):
+        """Add rule (with its current support) at the end."""
+        descriptors = sorted(rule.descriptors.items())
+        mask = 0
+        for attribute, _ in descriptors:
+            mask |= 1 << attribute
+        self.append_mask(mask)
+        self.values.extend(value for _, value in descriptors)
+        self.offsets.append(len(self.values))
+        self.decisions.append(rule.decision)
+        self.supports.append(rule.support)
+        self.scales.setdefault(len(descriptors), array.array('I')).append(len(self.decisions) - 1)
+
+    def append_mask(self, mask):
+        try:
+            self.masks.append(mask)
+        except OverflowError:
+            self.masks = list(self.masks)
+            self.masks.append(mask)
+
+    def extend(self, rules):
+        for rule in rules:
+            self.append(rule)
+
+    # Scales. <---------------------------------------------------------------------------------------------------------
+    def get_scales(self):
+        """Return sorted list of scales of rules."""
+        return sorted(self.scales)
+
+    def get_scale_length(self, scale):
+        """Return number of rules of scale."""
+        return len(self.scales.get(scale, ()))
+
+    def get_scale_rules(self, scale, decoded=True):
+        """Generator for rules of scale (with names of values if decoded)."""
+        for position in self.scales.get(scale, ()):
+            yield self.decode(self[position]) if decoded else self[position]
+
+    # Decoding. <-------------------------------------------------------------------------------------------------------
+    def decode(self, rule):
+        """Return rule with names of values (the same rule if there are no names)."""
+        if self.names is None:
+            return rule
+        values = tuple(self.names[attribute][value] for attribute, value in zip(bitsets.iterate_bits(rule.mask),
+                                                                                rule.values))
+        return CompactRule(rule.mask, values, self.names[-1][rule.decision], rule.support)
+
+    def decoded(self):
+        """Generator for all rules with names of values."""
+        for rule in self:
+            yield self.decode(rule)
+
+    @property
+    def nbytes(self):
+        """Number of bytes of columns and index of scales."""
+        columns = (self.values, self.offsets, self.decisions, self.supports)
+        size = sum(column.itemsize * len(column) for column in columns)
+        size += sum(positions.itemsize * len(positions) for positions in self.scales.values())
+        if isinstance(self.masks, array.array):
+            size += self.masks.itemsize * len(self.masks)
+        else:
+            size += sum(mask.__sizeof__() for mask in self.masks)
+        return size
@@ -1,6 +1,12 @@
-from distutils.core import setup
-from Cython.Build import cythonize
+from setuptools import setup
 
-setup(
+try:
+    from Cython.Build import cythonize
+except ImportError:  # compiled kernels are optional, tools.py has pure Python functions
+    ext_modules = []
+else:
     ext_modules = cythonize("reader.pyx")
-)
\ No newline at end of file
+
+setup(
+    ext_modules = ext_modules
+)
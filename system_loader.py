@@ -0,0 +1,214 @@
+"""Streaming loader of decision systems into compact per-column arrays.
+
+File is parsed in chunks of lines, every column is kept in array.array with smallest unsigned integer type that fits
+codes of its values, so peak memory stays close to size of final columns. Loaded system can be saved in memory-mapped
+form (header, symbolic names and raw columns) that is opened again without parsing the text file.
+"""
+import array
+import json
+import mmap
+import os
+import struct
+from encoder import Encoder
+
+TYPECODES = ('B', 'H', 'I', 'Q')  # unsigned types from smallest to largest
+CACHE_SUFFIX = '.columns'
+MAGIC = b'DSCOLS02'
+HEADER = struct.Struct('<8sQQQQQ')  # magic, rows, columns, names size, source size, source mtime (ns)
+
+
+def get_typecode(max_value):
+    """Return smallest unsigned array typecode for values up to max_value."""
+    for typecode in TYPECODES:
+        if max_value < 1 << 8 * array.array(typecode).itemsize:
+            return typecode
+    raise OverflowError("Value {} doesn't fit in 64 bits.".format(max_value))
+
+
+class ColumnSystem:
+    """Decision system stored as list of compact columns (last column is decision); rows are made on demand."""
+
+    def __init__(self, columns, names, buffer=None):
+        self.columns = columns
+        self.names = names  # list of values for every column (position is code)
+        self.buffer = buffer  # memory map that columns are views of (None if columns are in memory)
+
+    def __reduce__(self):
+        """Pickle columns as arrays (mapped columns are copied), e.g. for process pool."""
+        columns = [column if isinstance(column, array.array) else array.array(column.format, column)
+                   for column in self.columns]
+        return ColumnSystem, (columns, self.names)
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, index):
+        return [column[index] for column in self.columns]
+
+    def __iter__(self):
+        for row in zip(*self.columns):
+            yield list(row)
+
+    @property
+    def number_of_attributes(self):
+        return len(self.columns) - 1
+
+    @property
+    def nbytes(self):
+        """Return number of bytes used by columns."""
+        return sum(column.itemsize * len(column) for column in self.columns)
+
+    def close(self):
+        """Release memory map (columns can't be used after that)."""
+        if self.buffer is not None:
+            for column in self.columns:
+                column.release()
+            self.buffer.close()
+            self.buffer = None
+
+
+# Parsing of text files. <----------------------------------------------------------------------------------------------
+def read_chunks(system_file, chunk_size):
+    """Generator for lists of about chunk_size bytes of lines."""
+    while True:
+        lines = system_file.readlines(chunk_size)
+        if not lines:
+            return
+        yield lines
+
+
+def parse_system(system_file, chunk_size=1 << 20, progress=None, total_size=None, encoder=None):
+    """Return ColumnSystem parsed from opened text file; progress(rows, bytes) is called after every chunk."""
+    system_file.seek(0)  # return to beginning of file
+    encoder = encoder if encoder is not None else Encoder()
+    columns = None
+    limits = None  # maximal code that fits in every column
+    rows = 0
+    read_bytes = 0
+
+    for lines in read_chunks(system_file, chunk_size):
+        for line in lines:
+            read_bytes += len(line)
+            if line.strip() == '':  # skip empty lines
+                continue
+            codes = encoder.encode_line(line)
+            if columns is None:
+                columns = [array.array(TYPECODES[0]) for _ in codes]
+                limits = [(1 << 8 * column.itemsize) - 1 for column in columns]
+            for column_index, code in enumerate(codes):
+                if code > limits[column_index]:
+                    column = array.array(get_typecode(code), columns[column_index])
+                    columns[column_index] = column
+                    limits[column_index] = (1 << 8 * column.itemsize) - 1
+                columns[column_index].append(code)
+            rows += 1
+        if progress is not None:
+            progress(rows, read_bytes if total_size is None else min(read_bytes, total_size))
+
+    return ColumnSystem(columns or [], encoder.names)
+
+
+# Memory-mapped form. <-------------------------------------------------------------------------------------------------
+def align(offset):
+    """Return offset rounded up to multiple of 8."""
+    return (offset + 7) & ~7
+
+
+def save_columns(system, path, source_stat=None):
+    """Save columns and names of system in memory-mappable file."""
+    names = json.dumps(system.names).encode('utf-8')
+    typecodes = ''.join(column.typecode if hasattr(column, 'typecode') else column.format
+                        for column in system.columns).encode('ascii')
+    source_size = source_stat.st_size if source_stat else 0
+    source_mtime = source_stat.st_mtime_ns if source_stat else 0
+
+    temporary_path = '{}.{}.tmp'.format(path, os.getpid())  # reader never sees partly written file
+    try:
+        with open(temporary_path, 'wb') as output:
+            output.write(HEADER.pack(MAGIC, len(system), len(system.columns), len(names), source_size, source_mtime))
+            output.write(typecodes)
+            output.write(names)
+            for column in system.columns:
+                output.write(b'\0' * (align(output.tell()) - output.tell()))
+                output.write(memoryview(column).cast('B'))
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+
+
+def open_columns(path):
+    """Return ColumnSystem with columns mapped from file saved by save_columns."""
+    with open(path, 'rb') as source:
+        buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if len(buffer) < HEADER.size:
+            raise ValueError("{} is not a columns file.".format(path))
+        magic, rows, number_of_columns, names_size, _, _ = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("{} is not a columns file.".format(path))
+
+        offset = HEADER.size
+        if offset + number_of_columns + names_size > len(buffer):
+            raise ValueError("{} is truncated.".format(path))
+        typecodes = buffer[offset:offset + number_of_columns].decode('ascii')
+        offset += number_of_columns
+        names = json.loads(buffer[offset:offset + names_size].decode('utf-8'))
+        offset += names_size
+
+        layout = []
+        for typecode in typecodes:
+            if typecode not in TYPECODES:
+                raise ValueError("{} has unknown column type {!r}.".format(path, typecode))
+            offset = align(offset)
+            size = rows * array.array(typecode).itemsize
+            if offset + size > len(buffer):
+                raise ValueError("{} is truncated.".format(path))
+            layout.append((typecode, offset, size))
+            offset += size
+    except ValueError:
+        buffer.close()
+        raise
+
+    view = memoryview(buffer)
+    columns = [view[offset:offset + size].cast(typecode) for typecode, offset, size in layout]
+    view.release()
+    return ColumnSystem(columns, names, buffer)
+
+
+def is_cache_valid(path, cache_path):
+    """Return: True if cache was made from current version of file; False if not."""
+    try:
+        with open(cache_path, 'rb') as cache:
+            header = cache.read(HEADER.size)
+    except OSError:
+        return False
+    if len(header) != HEADER.size:
+        return False
+    magic, _, _, _, source_size, source_mtime = HEADER.unpack(header)
+    source_stat = os.stat(path)
+    return magic == MAGIC and source_size == source_stat.st_size and source_mtime == source_stat.st_mtime_ns
+
+
+def load_system(path, chunk_size=1 << 20, progress=None, cache=True, encoder=None):
+    """Return ColumnSystem from text file; with cache mapped columns file is used or created next to text file.
+
+    Cache is skipped when encoder is given, because codes of saved columns could differ from codes of encoder.
+    """
+    cache = cache and encoder is None
+    cache_path = path + CACHE_SUFFIX
+    if cache and is_cache_valid(path, cache_path):
+        try:
+            return open_columns(cache_path)
+        except ValueError:
+            pass  # damaged cache is made again
+
+    source_stat = os.stat(path)
+    with open(path) as system_file:
+        system = parse_system(system_file, chunk_size, progress, source_stat.st_size, encoder)
+    if cache:
+        save_columns(system, cache_path, source_stat)
+    return system
@@ -0,0 +1,32 @@
+"""Compiled classifier predicts the same decisions as naive_predict."""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import tools
+from classifier import RuleClassifier, naive_predict
+
+
+def make_rule(descriptors, decision, support=1):
+    return SimpleNamespace(descriptors=descriptors, decision=decision, support=support)
+
+
+def test_full_tie_goes_to_smaller_decision():
+    rules = [make_rule({0: 5}, 1), make_rule({0: 0}, 2), make_rule({1: 0}, 1), make_rule({1: 5}, 2)]
+    assert RuleClassifier(rules).predict([[0, 0]]) == naive_predict(rules, [[0, 0]]) == [1]
+    rules.reverse()
+    assert RuleClassifier(rules).predict([[0, 0]]) == naive_predict(rules, [[0, 0]]) == [1]
+
+
+@pytest.mark.parametrize('algorithm', ['covering', 'exhaustive', 'lem2'])
+@pytest.mark.parametrize('seed', range(3))
+def test_parity_with_naive_predict(algorithm, seed, make_system):
+    decision_system, _ = make_system(60, 4, noise=0.2, seed=seed)
+    rules = tools.find_rules(getattr(tools, algorithm), decision_system)
+    numbers = random.Random(seed)
+    objects = decision_system + [[numbers.randrange(3) for _ in range(4)] for _ in range(100)]
+    for weighted in (True, False):
+        if not weighted:  # equal supports make many ties
+            rules = [make_rule(rule.descriptors, rule.decision) for rule in rules]
+        assert RuleClassifier(rules, unmatched=None).predict(objects) == naive_predict(rules, objects)
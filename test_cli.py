@@ -0,0 +1,49 @@
+"""Command line: outputs, loading of files and checks of options."""
+import csv
+import json
+
+import cli
+import generator
+import tools
+
+
+def test_json_attributes_match_csv_header(tmp_path, make_system):
+    decision_system, _ = make_system(60, 4, classes=2, noise=0, seed=1)
+    rules = tools.find_rules(tools.lem2, decision_system)
+    cli.write_json(rules, str(tmp_path / 'rules.json'))
+    cli.write_csv(rules, str(tmp_path / 'rules.csv'), 4)
+    with open(str(tmp_path / 'rules.json')) as source:
+        saved = json.load(source)
+    with open(str(tmp_path / 'rules.csv'), newline='') as source:
+        rows = list(csv.DictReader(source))
+    assert len(saved) == len(rows) == len(rules)
+    for rule, row in zip(saved, rows):
+        assert {key: str(value) for key, value in rule['descriptors'].items()} == {
+            key: value for key, value in row.items() if key.startswith('a') and value != ''}
+
+
+def test_limits_need_stream(tmp_path, capsys):
+    path = str(tmp_path / 'system.txt')
+    generator.write_system(path, 60, 4, seed=1)
+    assert cli.main([path, '--max-rules', '2']) == 1
+    assert '--stream' in capsys.readouterr().err
+    assert not (tmp_path / 'system.lem2.json').exists()
+    assert cli.main([path, '--max-rules', '2', '--stream']) == 0
+    with open(str(tmp_path / 'system.lem2.json')) as source:
+        assert len(json.load(source)) == 2
+
+
+def test_files_are_loaded_in_columns(tmp_path):
+    path = str(tmp_path / 'system.txt')
+    generator.write_system(path, 60, 4, seed=1)
+    first = cli.process_file(path)
+    assert (tmp_path / 'system.txt.columns').is_file()
+    second = cli.process_file(path)  # mapped from cache
+    assert second['rules'] == first['rules'] and second['objects'] == first['objects'] == 60
+
+
+def test_deduplicate_needs_python_backend(tmp_path, capsys):
+    path = str(tmp_path / 'system.txt')
+    generator.write_system(path, 60, 4, seed=1)
+    assert cli.main([path, '--deduplicate', '--backend', 'numpy']) == 1
+    assert 'python backend' in capsys.readouterr().err
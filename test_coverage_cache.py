@@ -0,0 +1,41 @@
+"""Coverage cache stays in its bounds and keeps nothing of finished runs."""
+import pytest
+
+import bitsets
+import tools
+
+
+def test_bounds():
+    cache = bitsets.CoverageCache(maxsize=100, maxbytes=64)
+    for index in range(50):
+        cache.put(('token', index), (None, (1 << 200) - 1, 0))
+        assert cache.info()['nbytes'] <= 64
+    assert len(cache.entries) == 2
+    cache.resize(1, 1 << 10)
+    assert len(cache.entries) == 1
+
+
+def test_release():
+    cache = bitsets.CoverageCache()
+    cache.put((1, 'a'), (None, 7, 0))
+    cache.put((2, 'b'), (0, 3, 2))
+    cache.release(1)
+    assert list(cache.entries) == [(2, 'b')]
+    assert cache.info()['nbytes'] == 1
+
+
+@pytest.mark.parametrize('algorithm', ['covering', 'exhaustive', 'lem2'])
+def test_finished_run_is_released(algorithm, make_system):
+    decision_system, _ = make_system(60, 5, noise=0, seed=1)
+    expected = tools.find_rules(getattr(tools, algorithm), decision_system)
+    assert tools.get_cache_info()['size'] == 0
+    assert tools.get_cache_info()['nbytes'] == 0
+    assert len(tools.find_rules(getattr(tools, algorithm), decision_system)) == len(expected)
+
+
+def test_entry_without_coverage_is_miss():
+    cache = bitsets.CoverageCache()
+    cache.put((1, 'a'), (None, None, 0))
+    cache.get((1, 'a'))
+    cache.get((1, 'a'), needs_coverage=True)
+    assert (cache.info()['hits'], cache.info()['misses']) == (1, 1)
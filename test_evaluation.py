@@ -0,0 +1,15 @@
+"""Fold where algorithm fails is recorded and other algorithms still report."""
+import evaluation
+
+
+def test_failed_folds_are_recorded(make_system):
+    decision_system, _ = make_system(200, 4, 2, 2, noise=0.3, seed=1, consistent=False)
+    folds = evaluation.get_folds(len(decision_system), 4, 0)
+    results = evaluation.evaluate(decision_system, folds=folds)
+    assert len(results) == len(evaluation.ALGORITHMS) * 4
+    summary = evaluation.summarize(results)
+    assert summary['lem2'] == {'folds': 0, 'failed': 4, 'error': results[-1]['error']}
+    assert summary['covering']['folds'] == summary['exhaustive']['folds'] == 4
+    assert summary['covering']['failed'] == 0
+    lines = list(evaluation.format_summary(summary))
+    assert lines[-1].startswith('lem2: failed in all 4 folds: ')
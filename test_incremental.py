@@ -0,0 +1,65 @@
+"""Rules updated by IncrementalRules are rules of the whole system."""
+import pytest
+
+import tools
+from incremental import IncrementalRules
+from rule_set import RuleSet
+
+SPLITS = [(rows, attributes, seed, batch) for rows, attributes in ((40, 4), (120, 5)) for seed in range(4)
+          for batch in (1, 7)]
+
+
+def update(algorithm, decision_system, batch, rule_set=False):
+    """Return IncrementalRules of first half of system with the rest added in batches."""
+    start = len(decision_system) // 2
+    rules = None
+    if rule_set:
+        rules = tools.find_rules(algorithm, decision_system[:start], rules=RuleSet())
+    rules = IncrementalRules(algorithm, decision_system[:start], rules)
+    for position in range(start, len(decision_system), batch):
+        rules.add_objects(decision_system[position:position + batch])
+    return rules
+
+
+def fulfills(rule, decision_object):
+    return all(decision_object[attribute] == value for attribute, value in rule.descriptors.items())
+
+
+@pytest.mark.parametrize('split', SPLITS)
+def test_exhaustive_is_full_recompute(split, make_system, rule_keys):
+    rows, attributes, seed, batch = split
+    decision_system, _ = make_system(rows, attributes, noise=0.2, seed=seed)
+    rules = update(tools.exhaustive, decision_system, batch)
+    assert rules.decision_system == decision_system
+    assert rule_keys(rules.rules) == rule_keys(tools.find_rules(tools.exhaustive, decision_system))
+
+
+@pytest.mark.parametrize('algorithm', ['covering', 'lem2'])
+@pytest.mark.parametrize('split', SPLITS)
+def test_rules_are_consistent_cover_objects_and_have_exact_supports(algorithm, split, make_system):
+    rows, attributes, seed, batch = split
+    decision_system, _ = make_system(rows, attributes, noise=0.2, seed=seed)
+    rules = update(getattr(tools, algorithm), decision_system, batch).rules
+    for rule in rules:
+        assert all(decision_object[-1] == rule.decision for decision_object in decision_system
+                   if fulfills(rule, decision_object))
+    first_rules = {}  # position of first rule with decision of object that object fulfills -> number of objects
+    for decision_object in decision_system:
+        matched = [position for position, rule in enumerate(rules)
+                   if rule.decision == decision_object[-1] and fulfills(rule, decision_object)]
+        assert matched
+        first_rules[matched[0]] = first_rules.get(matched[0], 0) + 1
+    for position, rule in enumerate(rules):
+        if algorithm == 'covering':  # every supporting object counts
+            assert rule.support == sum(decision_object[-1] == rule.decision and fulfills(rule, decision_object)
+                                       for decision_object in decision_system)
+        else:  # LEM2 counts every object once, in rule that covers it first
+            assert rule.support == first_rules.get(position, 0)
+
+
+@pytest.mark.parametrize('algorithm', ['covering', 'exhaustive', 'lem2'])
+def test_rule_set_is_updated_as_list(algorithm, make_system, rule_keys):
+    decision_system, _ = make_system(80, 4, noise=0.2, seed=1)
+    expected = update(getattr(tools, algorithm), decision_system, 5).rules
+    rules = update(getattr(tools, algorithm), decision_system, 5, rule_set=True).rules
+    assert rule_keys(rules) == rule_keys(expected)
@@ -0,0 +1,97 @@
+"""Ingestion service on temporary directories: outputs, metrics and failed jobs."""
+import asyncio
+import json
+import os
+
+import generator
+import ingest
+
+induce_job = ingest.induce_job  # original, tests replace it in ingest
+
+
+def write_systems(directory, count, rows=60):
+    paths = []
+    for number in range(count):
+        path = os.path.join(str(directory), 'system{}.txt'.format(number))
+        generator.write_system(path, rows + number, 4, seed=number)
+        paths.append(path)
+    return paths
+
+
+def read_metrics(output_dir):
+    with open(os.path.join(str(output_dir), ingest.METRICS_FILE)) as source:
+        return [json.loads(line) for line in source]
+
+
+def dying_job(path, *arguments):
+    """induce_job that kills its worker process for file named bad."""
+    if os.path.basename(path).startswith('bad'):
+        os._exit(1)
+    return induce_job(path, *arguments)
+
+
+def test_watch_directory_once(tmp_path):
+    incoming = tmp_path / 'incoming'
+    incoming.mkdir()
+    paths = write_systems(incoming, 4)
+    (incoming / 'notes.md').write_text('not a system')
+    results = asyncio.run(ingest.watch_directory(str(incoming), str(tmp_path / 'rules'), once=True, workers=2,
+                                                 formats=('json', 'csv')))
+    assert sorted(result['path'] for result in results) == paths
+    assert all('error' not in result and result['rules'] > 0 for result in results)
+    for path in paths:
+        base = os.path.splitext(os.path.basename(path))[0]
+        for output_format in ('json', 'csv'):
+            assert (tmp_path / 'rules' / '{}.lem2.{}'.format(base, output_format)).is_file()
+    assert len(read_metrics(tmp_path / 'rules')) == 4
+
+
+def test_watch_directory_picks_up_new_and_changed_files(tmp_path):
+    incoming = tmp_path / 'incoming'
+    incoming.mkdir()
+    first, = write_systems(incoming, 1)
+
+    async def run():
+        stop = asyncio.Event()
+        watcher = asyncio.ensure_future(ingest.watch_directory(str(incoming), str(tmp_path / 'rules'), interval=0.05,
+                                                               stop=stop, workers=1))
+        await asyncio.sleep(0.5)
+        generator.write_system(str(incoming / 'late.txt'), 30, 3, seed=9)
+        generator.write_system(first, 90, 4, seed=3)
+        await asyncio.sleep(1.0)
+        stop.set()
+        return await watcher
+
+    results = asyncio.run(run())
+    assert [(os.path.basename(result['path']), result['objects']) for result in results
+            if 'error' not in result] == [('system0.txt', 60), ('late.txt', 30), ('system0.txt', 90)]
+
+
+def test_run_queue_records_bad_files(tmp_path):
+    paths = write_systems(tmp_path, 2)
+    (tmp_path / 'empty.txt').write_text('')
+
+    async def run():
+        queue = asyncio.Queue()
+        for path in [paths[0], str(tmp_path / 'missing.txt'), str(tmp_path / 'empty.txt'), paths[1], None]:
+            await queue.put(path)
+        return await ingest.run_queue(queue, str(tmp_path / 'rules'), workers=1)
+
+    results = asyncio.run(run())
+    errors = {os.path.basename(result['path']): result['error'] for result in results if 'error' in result}
+    assert sorted(errors) == ['empty.txt', 'missing.txt']
+    assert errors['missing.txt'].startswith('FileNotFoundError')
+    assert len(read_metrics(tmp_path / 'rules')) == 4
+
+
+def test_dead_worker_fails_only_its_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, 'induce_job', dying_job)
+    paths = write_systems(tmp_path, 7)
+    bad = str(tmp_path / 'bad.txt')
+    generator.write_system(bad, 20, 3, seed=1)
+    paths.insert(3, bad)
+    results = asyncio.run(asyncio.wait_for(ingest.run_paths(paths, str(tmp_path / 'rules'), workers=2), 60))
+    assert [result['path'] for result in results if 'error' in result] == [bad]
+    assert [result for result in results if result['path'] == bad][0]['retried']
+    assert len([result for result in results if 'error' not in result]) == 7
+    assert len(read_metrics(tmp_path / 'rules')) == 8
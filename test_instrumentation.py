@@ -0,0 +1,15 @@
+"""Every profiled function is called by some algorithm and profiling doesn't change rules."""
+import instrumentation
+import tools
+
+
+def test_profiled_functions_are_called(make_system):
+    decision_system, _ = make_system(100, 5, noise=0, seed=1)
+    called = set()
+    for algorithm in ('covering', 'exhaustive', 'lem2'):
+        expected = tools.find_rules(getattr(tools, algorithm), decision_system)
+        with instrumentation.Profiler() as profiler:
+            rules = tools.find_rules(getattr(tools, algorithm), decision_system)
+        assert len(rules) == len(expected)
+        called.update(profiler.get_summary())
+    assert called == set(instrumentation.FUNCTIONS)
@@ -0,0 +1,26 @@
+"""Streamed rules are rules of find_rules with limits applied."""
+import itertools
+import random
+
+import pytest
+
+import tools
+
+
+@pytest.mark.parametrize('algorithm', ['covering', 'exhaustive', 'lem2'])
+@pytest.mark.parametrize('limits', [{}, {'max_scale': 2}, {'min_support': 3}, {'max_rules': 5},
+                                    {'max_scale': 2, 'min_support': 2, 'max_rules': 10}])
+def test_limits(algorithm, limits, make_system, rule_keys):
+    decision_system, _ = make_system(80, 5, seed=1)
+    expected = [rule for rule in tools.find_rules(getattr(tools, algorithm), decision_system)
+                if rule.scale <= limits.get('max_scale', 5) and rule.support >= limits.get('min_support', 0)]
+    expected = expected[:limits.get('max_rules')]
+    rules = tools.iterate_rules(getattr(tools, algorithm), decision_system, **limits)
+    assert rule_keys(rules) == rule_keys(expected)
+
+
+def test_wide_system_stops_early():
+    numbers = random.Random(0)
+    decision_system = [[numbers.randrange(4) for _ in range(30)] + [numbers.randrange(2)] for _ in range(40)]
+    assert len(list(itertools.islice(tools.iterate_rules(tools.exhaustive, decision_system, max_rules=3), 5))) == 3
+    assert all(rule.scale == 1 for rule in tools.iterate_rules(tools.exhaustive, decision_system, max_scale=1))
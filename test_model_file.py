@@ -0,0 +1,92 @@
+"""Model file keeps system, names, weights and rules of get_system_objects and find_rules unchanged."""
+import struct
+
+import pytest
+
+import model_file
+import tools
+import weighted
+from rule_set import RuleSet
+
+ALGORITHMS = ('covering', 'exhaustive', 'lem2')
+
+
+def save(path, decision_system, names, algorithm='lem2'):
+    rules = tools.find_rules(getattr(tools, algorithm), decision_system, rules=RuleSet(names))
+    model_file.save_model(str(path), decision_system, names, rules, {'algorithm': algorithm})
+    return rules
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_round_trip(tmp_path, algorithm, make_system, rule_keys):
+    decision_system, names = make_system(60, 5)
+    rules = save(tmp_path / 'model', decision_system, names, algorithm)
+    with model_file.load_model(str(tmp_path / 'model')) as model:
+        assert [list(row) for row in model.system] == decision_system
+        assert model.names == names
+        assert model.metadata == {'algorithm': algorithm}
+        assert rule_keys(model.rules) == rule_keys(rules)
+        assert model.rules.get_scales() == rules.get_scales()
+        for scale in rules.get_scales():
+            assert list(model.rules.scales[scale]) == list(rules.scales[scale])
+        assert [rule.print_rule() for rule in model.rules.decoded()] == [rule.print_rule() for rule in rules.decoded()]
+
+
+def test_round_trip_of_weighted_system(tmp_path, make_system, rule_keys):
+    decision_system, names = make_system(200, 3)
+    unique = weighted.deduplicate(decision_system)
+    rules = save(tmp_path / 'model', unique, names)
+    with model_file.load_model(str(tmp_path / 'model')) as model:
+        assert [list(row) for row in model.system] == list(unique)
+        assert list(model.system.weights) == unique.weights
+        assert rule_keys(tools.find_rules(tools.lem2, model.system, rules=RuleSet())) == rule_keys(rules)
+
+
+def test_round_trip_of_wide_rules(tmp_path, rule_keys):
+    decision_system = [[index % 3] * 69 + [index % 2, index % 2] for index in range(20)]  # only last attribute
+    rules = RuleSet()
+    rules.extend(tools.find_rules(tools.covering, decision_system))
+    model_file.save_model(str(tmp_path / 'model'), rules=rules)
+    with model_file.load_model(str(tmp_path / 'model')) as model:
+        assert model.system is None
+        assert rule_keys(model.rules) == rule_keys(rules)
+        assert model.rules[0].attributes == [69]
+
+
+def test_corrupt_section(tmp_path, make_system):
+    decision_system, names = make_system(60, 5)
+    save(tmp_path / 'model', decision_system, names)
+    content = bytearray((tmp_path / 'model').read_bytes())
+    content[-1] ^= 0xFF
+    (tmp_path / 'model').write_bytes(bytes(content))
+    with pytest.raises(ValueError, match='checksum of section'):
+        model_file.load_model(str(tmp_path / 'model'))
+    model_file.load_model(str(tmp_path / 'model'), verify=False).close()
+
+
+def test_truncated_file(tmp_path, make_system):
+    decision_system, names = make_system(60, 5)
+    save(tmp_path / 'model', decision_system, names)
+    content = (tmp_path / 'model').read_bytes()
+    (tmp_path / 'model').write_bytes(content[:-8])
+    with pytest.raises(ValueError, match='truncated'):
+        model_file.load_model(str(tmp_path / 'model'))
+    (tmp_path / 'model').write_bytes(content[:model_file.HEADER.size + 4])
+    with pytest.raises(ValueError, match='section table'):
+        model_file.load_model(str(tmp_path / 'model'))
+
+
+def test_newer_version(tmp_path, make_system):
+    decision_system, names = make_system(60, 5)
+    save(tmp_path / 'model', decision_system, names)
+    content = bytearray((tmp_path / 'model').read_bytes())
+    struct.pack_into('<H', content, 8, model_file.VERSION + 1)
+    (tmp_path / 'model').write_bytes(bytes(content))
+    with pytest.raises(ValueError, match='version'):
+        model_file.load_model(str(tmp_path / 'model'))
+
+
+def test_not_model_file(tmp_path):
+    (tmp_path / 'model').write_bytes(b'a b c\n' * 10)
+    with pytest.raises(ValueError, match='not a model file'):
+        model_file.load_model(str(tmp_path / 'model'))
@@ -0,0 +1,31 @@
+"""Numpy backend finds the same rules (in the same order) as python backend."""
+import pytest
+
+import reducts
+import tools
+
+pytest.importorskip('numpy')
+
+ALGORITHMS = ('covering', 'exhaustive', 'lem2')
+SYSTEMS = [(rows, attributes, cardinality, classes, seed)
+           for rows, attributes, cardinality, classes in ((20, 3, 2, 2), (60, 4, 3, 2), (120, 5, 3, 3), (200, 6, 4, 4))
+           for seed in range(3)]
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+@pytest.mark.parametrize('system', SYSTEMS)
+def test_numpy_backend_finds_same_rules(algorithm, system, make_system, rule_keys):
+    rows, attributes, cardinality, classes, seed = system
+    decision_system, _ = make_system(rows, attributes, cardinality, classes, seed=seed)
+    expected = tools.find_rules(getattr(tools, algorithm), decision_system)
+    rules = tools.find_rules(getattr(tools, algorithm), decision_system, backend='numpy')
+    assert rule_keys(rules) == rule_keys(expected)
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_numpy_backend_finds_same_rules_with_reduct(algorithm, make_system, rule_keys):
+    decision_system, _ = make_system(80, 6, classes=2, seed=7)
+    reduct = reducts.get_reduct(decision_system)
+    expected = tools.find_rules(getattr(tools, algorithm), decision_system, attributes=reduct)
+    rules = tools.find_rules(getattr(tools, algorithm), decision_system, backend='numpy', attributes=reduct)
+    assert rule_keys(rules) == rule_keys(expected)
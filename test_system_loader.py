@@ -0,0 +1,60 @@
+"""Columns file round trip, atomic save and damaged files."""
+import os
+import pickle
+
+import pytest
+
+import generator
+import system_loader
+
+
+@pytest.fixture
+def system_path(tmp_path):
+    path = str(tmp_path / 'system.txt')
+    with open(path, 'w') as system_file:
+        system_file.write(generator.get_system_text(50, 4, 3, 3, 0.1, True, 1))
+    return path
+
+
+def test_round_trip(system_path):
+    system = system_loader.load_system(system_path)
+    assert os.path.exists(system_path + system_loader.CACHE_SUFFIX)
+    mapped = system_loader.load_system(system_path)
+    assert mapped.buffer is not None
+    assert list(mapped) == list(system) and mapped.names == system.names
+    mapped.close()
+    assert [name for name in os.listdir(os.path.dirname(system_path)) if name.endswith('.tmp')] == []
+
+
+def test_failed_save_keeps_old_file(system_path, monkeypatch):
+    system = system_loader.load_system(system_path)
+    cache_path = system_path + system_loader.CACHE_SUFFIX
+    with open(cache_path, 'rb') as cache:
+        content = cache.read()
+    monkeypatch.setattr(system_loader, 'align', lambda offset: 1 // 0)
+    with pytest.raises(ZeroDivisionError):
+        system_loader.save_columns(system, cache_path)
+    with open(cache_path, 'rb') as cache:
+        assert cache.read() == content
+    assert sorted(os.listdir(os.path.dirname(system_path))) == ['system.txt', 'system.txt.columns']
+
+
+@pytest.mark.parametrize('size', [0, 10, system_loader.HEADER.size + 2, -1])
+def test_truncated_file(system_path, size):
+    system = system_loader.load_system(system_path)
+    cache_path = system_path + system_loader.CACHE_SUFFIX
+    with open(cache_path, 'rb') as cache:
+        content = cache.read()
+    with open(cache_path, 'wb') as cache:
+        cache.write(content[:size])
+    with pytest.raises(ValueError):
+        system_loader.open_columns(cache_path)
+    assert list(system_loader.load_system(system_path)) == list(system)
+
+
+def test_mapped_system_pickles_as_arrays(system_path):
+    system = system_loader.load_system(system_path)
+    mapped = system_loader.load_system(system_path)
+    copied = pickle.loads(pickle.dumps(mapped))
+    mapped.close()
+    assert copied.buffer is None and list(copied) == list(system) and copied.names == system.names
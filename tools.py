@@ -1,195 +1,431 @@
+import array
 import itertools as it
+import math
 import classes
-import collections
+import bitsets
+from rule_set import RuleSet
+from encoder import Encoder
 
 
 # Functions for read rule based system and transform symbols to integers. <---------------------------------------------
-def get_system_objects(system_file):
-    """Return numpy array with integers that represent Rule Based System and dictionary to encode true values."""
+def get_system_objects(system_file, encoder=None):
+    """Return list of objects with integers that represent Rule Based System and list of names of codes per column."""
     system_file.seek(0)  # return to beginning of file
     objects = []
-    unique_values = {}
+    encoder = encoder if encoder is not None else Encoder()
     for line in system_file:
         if line.strip() != '':  # true if line isn't empty
-            objects.append(get_object(line, unique_values))  # append Decision Object to list of objects
-    return objects, dict(zip(unique_values.values(), unique_values.keys()))
+            objects.append(get_object(line, encoder))  # append Decision Object to list of objects
+    return objects, encoder.names
 
 
-def get_object(line, unique_values):
-    """Transform string values to uint16s and return array with uint16 values"""
-    decision_object = []
-    line = line.rstrip().split(' ')  # remove from end all white chars and split row by ' '
-    for value in line:
-        if value not in unique_values:
-            unique_values[value] = get_object.counter
-            get_object.counter += 1
-        decision_object.append(unique_values.get(value))
-    return decision_object
-
-get_object.counter = 0
+def get_object(line, encoder):
+    """Transform string values to integers (codes from encoder) and return list with them."""
+    return encoder.encode_line(line)
 
 
 # Base function for all algorithms. <-----------------------------------------------------------------------------------
-def find_rules(algorithm, decision_system):
-    """Return rules calculeted by function from argument."""
-    rules = []  # all rules from current algorithm
-    number_of_attributes = len(decision_system[0]) - 1  # number of attributes
-    attributes = [attribute_index for attribute_index in range(number_of_attributes)]  # list of attributes ids
-
-    algorithm(decision_system, rules, attributes)
+class Cancelled(Exception):
+    """Raised by progress function to stop calculation of rules."""
+
+
+def find_rules(algorithm, decision_system, backend='python', workers=1, progress=None, rules=None, attributes=None):
+    """Return rules calculeted by function from argument (backend: 'python' or 'numpy', workers: processes).
+
+    progress(done, total) is called after every scale (covering), object (exhaustive) or concept (LEM2).
+    rules is container with append and extend for found rules (new list if None), e.g. RuleSet that keeps rules compact.
+    attributes is list of attributes that rules can use (all if None), e.g. reduct.
+    """
+    if rules is None:
+        rules = []  # all rules from current algorithm
+    if workers > 1 and backend == 'python':
+        import parallel
+        rules.extend(parallel.find_rules(algorithm, decision_system, workers, progress, attributes))
+        return rules
+    if backend == 'numpy':
+        if getattr(decision_system, 'weights', None) is not None:
+            raise ValueError("Numpy backend doesn't use weights of rows, use python backend or expanded rows.")
+        import numpy_tools  # numpy is needed only by this backend
+        rules.extend(numpy_tools.find_rules(getattr(numpy_tools, algorithm.__name__),
+                                            numpy_tools.get_system_array(decision_system), attributes))
+        return rules
+    elif backend != 'python':
+        raise ValueError("Unknown backend: {}".format(backend))
+
+    if attributes is None:
+        number_of_attributes = len(decision_system[0]) - 1  # number of attributes
+        attributes = [attribute_index for attribute_index in range(number_of_attributes)]  # list of attributes ids
+
+    algorithm(decision_system, rules, list(attributes), progress)
     return rules
 
 
+def iterate_rules(algorithm, decision_system, attributes=None, max_scale=None, min_support=0, max_rules=None,
+                  progress=None):
+    """Generator for rules of algorithm as they are found (python backend), e.g. to write them while search runs.
+
+    Rules longer than max_scale or with support smaller than min_support are skipped and search stops after
+    max_rules rules. Exhaustive rules are searched lazily (only up to max_scale and only until max_rules), so memory
+    doesn't grow with number of rules. Covering and LEM2 find at most one rule for every object, they run whole.
+    """
+    if attributes is None:
+        attributes = range(len(decision_system[0]) - 1)
+    if algorithm is not exhaustive:
+        rules = (rule for rule in find_rules(algorithm, decision_system, progress=progress, attributes=attributes)
+                 if (max_scale is None or rule.scale <= max_scale) and rule.support >= min_support)
+        yield from it.islice(rules, max_rules)
+        return
+    index = get_index(decision_system)
+    try:
+        yield from it.islice(iterate_exhaustive_rules(decision_system, list(attributes), index, progress=progress,
+                                                      max_scale=max_scale, min_support=min_support), max_rules)
+    finally:
+        release_index(index)
+
+
+def report(progress, done, total):
+    """Call progress function if it is given."""
+    if progress is not None:
+        progress(done, total)
+
+
+# Consistency cache shared by all algorithms. <-------------------------------------------------------------------------
+CACHE_SIZE = 1 << 16  # default maximal number of remembered descriptor sets
+CACHE_BYTES = 1 << 26  # default maximal bytes of remembered coverage bitsets
+
+cache = bitsets.CoverageCache(CACHE_SIZE, CACHE_BYTES)
+
+
+def set_cache_size(size, nbytes=None):
+    """Change maximal number of descriptor sets (0 turns cache off) and bytes of bitsets in consistency cache."""
+    cache.resize(size, nbytes)
+
+
+def get_cache_info():
+    """Return hits, misses, evictions, hit rate, size and bytes of consistency cache."""
+    return cache.info()
+
+
+def get_index(decision_system, weights=None):
+    """Return bitset index of decision system that uses consistency cache (weights of WeightedSystem are used)."""
+    if weights is None:
+        weights = getattr(decision_system, 'weights', None)
+    return bitsets.BitsetIndex(decision_system, cache if cache.maxsize else None, weights)
+
+
+def release_index(index):
+    """Remove entries of index from consistency cache (when algorithm that made index ends)."""
+    if index.cache is not None:
+        index.cache.release(index.token)
+
+
+# Compiled kernels (optional). <----------------------------------------------------------------------------------------
+try:
+    import reader  # built by setup.py (needs Cython), pure Python functions are used without it
+except ImportError:
+    reader = None
+
+kernels = reader  # module of compiled kernels in use (None: pure Python functions)
+KERNEL_ROWS = 1 << 13  # covering checks rules by scan of table only up to this size, cached bitsets are faster above
+
+
+def set_kernels(compiled):
+    """Use compiled kernels (when reader module is built) or pure Python functions, e.g. to compare them."""
+    global kernels
+    kernels = reader if compiled else None
+
+
+def get_table(rows):
+    """Return rows (with decision) as typed memoryview for compiled kernels (None without kernels or for values that
+    aren't unsigned int codes)."""
+    if kernels is None:
+        return None
+    width = None
+    values = array.array('I')
+    try:
+        for row in rows:
+            if width is None:
+                width = len(row)
+            elif len(row) != width:
+                return None
+            values.extend(row)
+    except (OverflowError, TypeError):
+        return None
+    if not width:
+        return None
+    return memoryview(values).cast('B').cast('I', (len(values) // width, width))
+
+
 # Covering base function and support functions. <-----------------------------------------------------------------------
-def covering(decision_system, rules, attributes):
+def covering(decision_system, rules, attributes, progress=None):
     """Calculate rules by sequential covering."""
+    index = get_index(decision_system)  # bitsets of descriptors and decision classes
+    try:
+        find_covering_rules(decision_system, rules, attributes, index, progress)
+    finally:
+        release_index(index)
+
+
+def find_covering_rules(decision_system, rules, attributes, index, progress=None):
+    """Calculate rules by sequential covering with bitset index."""
     number_of_attributes = attributes.__len__() # number of attributes
-    number_of_objects = decision_system.__len__()  # number of decision objects in decision system
-    eliminated = set()  # indexes of object that don't need to calculate
+    if kernels is not None and number_of_attributes <= kernels.MAX_ATTRIBUTES and len(decision_system) <= KERNEL_ROWS:
+        index.table = get_table(decision_system)  # rows for compiled consistency kernel
+    eliminated = 0  # bitset of object that don't need to calculate
 
     for scale in range(number_of_attributes):
         scale += 1
         combination_of_attributes = list(it.combinations(attributes, scale))
-        for index, decision_object in enumerate(decision_system):
-            if index not in eliminated:
+        for object_index, decision_object in enumerate(decision_system):
+            if not eliminated >> object_index & 1:
                 for combination in combination_of_attributes:
                     rule = classes.Rule(combination, decision_object, scale)
-                    if is_rule_inconsistent(rule, decision_system):
-                        set_rule_support_and_eliminate(rule, decision_system, eliminated)
+                    if is_rule_inconsistent(rule, index):
+                        eliminated = set_rule_support_and_eliminate(rule, index, eliminated)
                         rules.append(rule)
                         break
-                if end(eliminated.__len__(), number_of_objects):
+                if end(eliminated, index):
+                    report(progress, number_of_attributes, number_of_attributes)
                     return
+        report(progress, scale, number_of_attributes)
     return
 
 
-def set_rule_support_and_eliminate(rule, objects, eliminated):
-    """Calculate support of rule and eliminate supporting objects"""
-    for index, decision_object in enumerate(objects):
-        if has_object_fulfill_rule(rule, decision_object) and rule.decision == decision_object[-1]:
-            eliminated.add(index)
-            rule.support += 1
+def set_rule_support_and_eliminate(rule, index, eliminated):
+    """Calculate support of rule and return eliminated objects together with supporting objects."""
+    supporting = index.get_support(rule.descriptors, rule.decision)
+    rule.support += index.count(supporting)
+    return eliminated | supporting
 
 
-def end(number_of_eliminated, number_of_objects):
+def end(eliminated, index):
     """Return: True if all objects was used; False if find not covered object."""
-    return number_of_eliminated == number_of_objects
+    return eliminated == index.universe
 
 
 # Exhaustive base function and support functions. <---------------------------------------------------------------------
-def exhaustive(decision_system, rules, attributes):
-    """Calculate rules by exhaustive algorithm (with indistinguishable matrix)."""
-    matrix = get_matrix(decision_system)
-
-    for index, matrix_object in enumerate(matrix):
-        for combination in all_combinations(attributes):
-            if not is_combination_in_row(matrix_object, combination):
-                rule = classes.Rule(combination, decision_system[index], combination.__len__())
-                if not is_rule_in_rules(rule, rules):
-                    set_rule_support(rule, decision_system)
-                    rules.append(rule)
+MAX_KEPT_COMBINATIONS = 1 << 14  # combinations (with masks) kept for all objects, more are made again for every object
+
+
+def exhaustive(decision_system, rules, attributes, progress=None):
+    """Calculate rules by exhaustive algorithm (with compressed discernibility matrix computed row by row)."""
+    index = get_index(decision_system)
+    try:
+        return find_exhaustive_rules(decision_system, rules, attributes, index, progress=progress)
+    finally:
+        release_index(index)
+
+
+def find_exhaustive_rules(decision_system, rules, attributes, index, object_indexes=None, progress=None,
+                          unique_objects=None):
+    """Calculate exhaustive rules of objects from object_indexes (all unique objects if None)."""
+    rules.extend(iterate_exhaustive_rules(decision_system, attributes, index, object_indexes, progress,
+                                          unique_objects))
     return rules
 
 
-def get_matrix(decision_system):
-    """Return indistinguishable matrix."""
-    matrix = []
-    for current_object in decision_system:
-        matrix.append(get_row(current_object, decision_system))
-    return matrix
+def iterate_exhaustive_rules(decision_system, attributes, index, object_indexes=None, progress=None,
+                             unique_objects=None, max_scale=None, min_support=0):
+    """Generator for exhaustive rules of objects from object_indexes (all unique objects if None) as they are found.
+
+    Rule is new when no processed object supports it, so memory doesn't grow with number of rules. Rules longer than
+    max_scale aren't searched, rules with support smaller than min_support are used for minimality, but not yielded.
+    """
+    combinations = None  # (combination, mask) pairs kept only when there are few of them, else made for every object
+    if count_combinations(len(attributes), max_scale) <= MAX_KEPT_COMBINATIONS:
+        combinations = list(iterate_combination_masks(attributes, max_scale))
+    processed = 0  # bitset of processed objects, their rules were already found
+    found = {}  # object index -> masks of rules that cover object (unique objects not processed yet)
+    if unique_objects is None:
+        unique_objects = get_unique_objects(decision_system)
+    representatives = set(unique_objects.values())
+    total = len(representatives) if object_indexes is None else len(object_indexes)
+
+    for done, (object_index, row) in enumerate(get_matrix(decision_system, unique_objects, object_indexes)):
+        decision_object = decision_system[object_index]
+        found_masks = found.pop(object_index, [])
+        object_combinations = combinations
+        if object_combinations is None:
+            object_combinations = iterate_combination_masks(attributes, max_scale)
+        for combination, combination_mask in object_combinations:
+            if has_mask_contains_mask(combination_mask, found_masks):
+                continue  # only minimal rules, combination contains already found rule
+            if is_combination_in_row(row, combination_mask):
+                continue  # combination doesn't discern object from all objects of other decisions
+            rule = classes.Rule(combination, decision_object, combination.__len__())
+            supporting = set_rule_support(rule, index)
+            found_masks.append(combination_mask)
+            if is_rule_found(rule, supporting, processed):
+                continue
+            for covered_index in bitsets.iterate_bits(supporting >> object_index + 1):
+                covered_index += object_index + 1
+                if covered_index in representatives:
+                    found.setdefault(covered_index, []).append(combination_mask)
+            if rule.support >= min_support:
+                yield rule
+        processed |= 1 << object_index
+        report(progress, done + 1, total)
+
+
+def get_matrix(decision_system, unique_objects=None, object_indexes=None):
+    """Generator for (object index, row) of discernibility matrix for every unique object (or for object_indexes)."""
+    if unique_objects is None:
+        unique_objects = get_unique_objects(decision_system)
+    if object_indexes is None:
+        object_indexes = unique_objects.values()
+    table = None
+    if kernels is not None and unique_objects and len(next(iter(unique_objects))) - 1 <= kernels.MAX_ATTRIBUTES:
+        table = get_table(unique_objects)
+        positions = {object_index: position for position, object_index in enumerate(unique_objects.values())}
+    for object_index in object_indexes:
+        if table is not None:
+            yield object_index, kernels.get_row(table, positions[object_index])
+        else:
+            yield object_index, get_row(decision_system[object_index], unique_objects)
+
+
+def get_unique_objects(decision_system):
+    """Return dictionary: object values -> index of first object with these values."""
+    unique_objects = {}
+    for object_index, decision_object in enumerate(decision_system):
+        unique_objects.setdefault(tuple(decision_object), object_index)
+    return unique_objects
+
+
+def get_row(current_object, unique_objects):
+    """Return row of discernibility matrix: minimal cells (no cell is superset of other) against other decisions."""
+    cells = set()
+    for decision_object in unique_objects:
+        if current_object[-1] != decision_object[-1]:
+            cells.add(get_cell(current_object, decision_object))
+    return absorb_cells(cells)
+
 
+def get_cell(current_object, decision_object):
+    """Return cell of discernibility matrix: bitmask of attributes with different values."""
+    cell = 0
+    for index in range(len(current_object) - 1):
+        if current_object[index] != decision_object[index]:
+            cell |= 1 << index
+    return cell
 
-def get_row(current_object, decision_system):
-    """Return row of indistinguishable matrix."""
+
+def absorb_cells(cells):
+    """Return list of cells without cells that are supersets of other cells."""
     row = []
-    for decision_object in decision_system:
-        row.append(get_cell(current_object, decision_object))
+    for cell in sorted(cells, key=bitsets.popcount):
+        if not has_mask_contains_mask(cell, row):
+            row.append(cell)
     return row
 
 
-def get_cell(current_object, decision_object):
-    """Return cell of indistinguishable matrix."""
-    cell = []
-    if current_object[-1] == decision_object[-1]:
-        return cell
-    for index, attribute in enumerate(current_object):
-        if attribute == decision_object[index]:
-            cell.append(index)
-    return cell
+def get_attributes_mask(combination):
+    """Return bitmask of attributes from combination."""
+    mask = 0
+    for attribute in combination:
+        mask |= 1 << attribute
+    return mask
+
+
+def has_mask_contains_mask(mask, masks):
+    """Return: True if mask contains at least one mask from masks; False if not."""
+    for other_mask in masks:
+        if mask & other_mask == other_mask:
+            return True
+    return False
+
 
+def iterate_combination_masks(attributes, max_scale=None):
+    """Generator for (combination, attributes mask) of all combinations up to max_scale attributes (all if None)."""
+    for combination in all_combinations(attributes, max_scale):
+        yield combination, get_attributes_mask(combination)
 
-def all_combinations(attributes):
-    """Generator for all picks combinations."""
-    for scale in range(len(attributes)):
+
+def count_combinations(number_of_attributes, max_scale=None):
+    """Return number of combinations of attributes up to max_scale attributes (all if None)."""
+    if max_scale is None or max_scale > number_of_attributes:
+        max_scale = number_of_attributes
+    return sum(math.comb(number_of_attributes, scale) for scale in range(1, max_scale + 1))
+
+
+def all_combinations(attributes, max_scale=None):
+    """Generator for all picks combinations (up to max_scale attributes, longer ones are never made)."""
+    if max_scale is None or max_scale > len(attributes):
+        max_scale = len(attributes)
+    for scale in range(max_scale):
         for combination in it.combinations(attributes, scale + 1):
             yield combination
 
 
-def is_combination_in_cell(cell, combination):
-    """Return: True if combination of attributes is in cell of indistinguishable matrix; False if not."""
-    for attribute in combination:
-        if attribute not in cell:
-            return False
-    return True
+def is_combination_in_cell(cell, combination_mask):
+    """Return: True if combination of attributes doesn't discern objects of cell; False if it does."""
+    return not cell & combination_mask
 
 
-def is_combination_in_row(row, combination):
+def is_combination_in_row(row, combination_mask):
     """Return: True if combination is in object; False if not."""
     for cell in row:
-        if is_combination_in_cell(cell, combination):
+        if is_combination_in_cell(cell, combination_mask):
             return True
     return False
 
 
-def has_rule_contains_rule(first, second):
-    """Return: True if all descriptors from second rule is in first rule; False if at lest one descriptor is not in."""
-    for key, value in second.descriptors.items():
-        if key not in first.descriptors or first.descriptors[key] != value:
-            return False
-    return True
+def get_rule_key(rule):
+    """Return hashable key of rule descriptors."""
+    return get_attributes_mask(rule.descriptors), tuple(value for _, value in sorted(rule.descriptors.items()))
 
 
-def is_rule_in_rules(rule, rules):
-    """Return: True if at least one rule from rules contains rule from argument; False if rule not contains."""
-    for added_rule in rules:
-        if has_rule_contains_rule(rule, added_rule):
-            return True
-    return False
+def is_rule_found(rule, supporting, processed):
+    """Return: True if rule was found for processed object (object supports it); False if not."""
+    return bool(supporting & processed)
 
 
-def set_rule_support(rule, objects):
-    """Calculate support of rule (in exhaustive algorithm)."""
-    for decision_object in objects:
-        if has_object_fulfill_rule(rule, decision_object) and rule.decision == decision_object[-1]:
-            rule.support += 1
+def set_rule_support(rule, index):
+    """Calculate support of rule (in exhaustive algorithm) and return bitset of supporting objects."""
+    supporting = index.get_support(rule.descriptors, rule.decision)
+    rule.support += index.count(supporting)
+    return supporting
 
 
 # LEM2 base function and support functions. <---------------------------------------------------------------------------
-def lem2(decision_system, rules, attributes):
+def lem2(decision_system, rules, attributes, progress=None):
     """Calculate rules by LEM2 algorithm (Learn from Examples by Modules)."""
+    index = get_index(decision_system)
     unique_decisions = get_unique(decision[-1] for decision in decision_system)
-    for decision in unique_decisions:
-        concept_objects = get_concept_objects(decision_system, decision)
-        while concept_objects:
-            descriptors = {}
-            tmp_attributes = attributes[:]
-            find_lem_rules(concept_objects, descriptors, concept_objects, tmp_attributes, decision_system, rules)
-
-
-def find_lem_rules(mode_objects, descriptors, concept_objects, tmp_attributes, decision_system, rules):
-    """Find all rules by recursion."""
-    descriptor = get_descriptor(mode_objects, tmp_attributes)
-    add_descriptor(descriptors, descriptor)
-    remove_attribute(tmp_attributes, descriptor)
-    mode_objects = get_mode_objects(mode_objects, descriptor)
-    rule = classes.Rule(descriptors.keys(), mode_objects[0], descriptors.keys().__len__())
-    if not is_rule_inconsistent(rule, decision_system):
-        find_lem_rules(mode_objects, descriptors, concept_objects, tmp_attributes, decision_system, rules)
-    else:
-        set_rule_support_lem(rule, mode_objects, concept_objects)
+    try:
+        for done, decision in enumerate(unique_decisions):
+            find_concept_rules(decision_system, rules, attributes, index, decision)
+            report(progress, done + 1, len(unique_decisions))
+    finally:
+        release_index(index)
+
+
+def find_concept_rules(decision_system, rules, attributes, index, decision, concept_objects=None):
+    """Calculate LEM2 rules of one decision concept (or of its objects from concept_objects bitset)."""
+    if concept_objects is None:
+        concept_objects = index.decisions[decision]  # bitset of not covered objects from concept
+    while concept_objects:
+        rule, mode_objects = find_lem_rule(concept_objects, attributes, decision_system, index, decision)
+        concept_objects = set_rule_support_lem(rule, mode_objects, concept_objects, index)
         rules.append(rule)
 
 
+def find_lem_rule(concept_objects, attributes, decision_system, index, decision):
+    """Return consistent rule for not covered concept objects and bitset of concept objects that it covers."""
+    descriptors = {}
+    mode_objects = concept_objects  # not covered concept objects that fulfill descriptors
+    tmp_attributes = attributes[:]
+    while not descriptors or not is_descriptors_consistent(descriptors, decision, index):
+        if not tmp_attributes:
+            raise ValueError("Decision system is inconsistent, objects with same attributes have other decisions.")
+        descriptor = get_descriptor(mode_objects, tmp_attributes, index)
+        add_descriptor(descriptors, descriptor)
+        remove_attribute(tmp_attributes, descriptor)
+        mode_objects = get_mode_objects(mode_objects, descriptor, index)
+    rule = classes.Rule(descriptors.keys(), decision_system[bitsets.lowest_bit(mode_objects)], len(descriptors))
+    return rule, mode_objects
+
+
 def remove_attribute(attributes, descriptor):
     """Remove attribute from list of attributes."""
     for att in descriptor:
@@ -202,63 +438,54 @@ def add_descriptor(descriptors, descriptor):
         descriptors[key] = value
 
 
-def set_rule_support_lem(rule, mode_objects, concept_objects):
-    """Calculate support of rule."""
-    for decision_object in mode_objects:
-        if has_object_fulfill_rule(rule, decision_object) and rule.decision == decision_object[-1]:
-            concept_objects.remove(decision_object)
-            rule.support += 1
-
+def set_rule_support_lem(rule, mode_objects, concept_objects, index):
+    """Calculate support of rule and return concept objects without supporting objects."""
+    supporting = index.get_coverage(rule.descriptors, mode_objects) & index.decisions[rule.decision]
+    rule.support += index.count(supporting)
+    return concept_objects & ~supporting
 
-def get_mode_objects(objects, descriptors):
-    """Return objects that contains descriptors."""
-    mode_objects = []
-    for decision_object in objects:
-        for key, value in descriptors.items():
-            if decision_object[key] == value:
-                mode_objects.append(decision_object)
-    return mode_objects
 
+def get_mode_objects(objects, descriptors, index):
+    """Return bitset of objects that contains descriptors."""
+    return index.get_coverage(descriptors, objects)
 
-def get_concept_objects(decision_system, decision):
-    """Return objects with decision from argument."""
-    concept_objects = []
-    for decision_object in decision_system:
-        if decision_object[-1] == decision:
-            concept_objects.append(decision_object)
-    return concept_objects
 
-
-def get_descriptor(concept_objects, attributes):
-    """Return mode descriptor from concept objects."""
+def get_descriptor(concept_objects, attributes, index):
+    """Return descriptor with the most concept objects (ties go to descriptor that covers fewer objects)."""
     mode_descriptor = {}
-    most_common = 0
-
+    best = None
     for attribute in attributes:
-        column = get_concept_column(concept_objects, attribute)
-        mode = collections.Counter(column).most_common(1)  # out: [(value, count)]
-        if mode[0][1] > most_common:
-            most_common = mode[0][1]
-            mode_descriptor = {attribute: mode[0][0]}
+        for value, count in get_value_counts(concept_objects, attribute, index):
+            key = (count, -index.counts[(attribute, value)])
+            if best is None or key > best:
+                best = key
+                mode_descriptor = {attribute: value}
     return mode_descriptor
 
 
-def get_concept_column(concept_objects, attribute):
-    """Generator for decision objects with decision."""
-    column = []
-    for decision_object in concept_objects:
-        column.append(decision_object[attribute])
-    return column
+def get_value_counts(concept_objects, attribute, index):
+    """Generator for (value, number of concept objects with value) of attribute (values in ascending order)."""
+    for value in index.values[attribute]:
+        count = index.count(concept_objects & index.descriptors[(attribute, value)])
+        if count:
+            yield value, count
 
 
 # Universal tools. <----------------------------------------------------------------------------------------------------
-def is_rule_inconsistent(rule, objects):
-    """Return: True if rule is inconsistent; False if not."""
-    for decision_object in objects:
-        if rule.decision != decision_object[-1] and has_object_fulfill_rule(rule, decision_object):
-            return False
-    else:
-        return True
+def is_rule_inconsistent(rule, index):
+    """Return: True if rule is inconsistent; False if not.
+
+    Table is set only for small systems (KERNEL_ROWS), scan of all rows for every check is slower than cache above.
+    """
+    if kernels is not None and index.table is not None:
+        return kernels.is_consistent(index.table, rule.descriptors, rule.decision)
+    return index.is_consistent(rule.descriptors, rule.decision)
+
+
+def is_descriptors_consistent(descriptors, decision, index):
+    """Return: True if no object from other decision fulfill descriptors (LEM2 checks rule before it's made); False
+    if one does."""
+    return index.is_consistent(descriptors, decision)
 
 
 def has_object_fulfill_rule(rule, decision_object):
@@ -280,13 +507,25 @@ def get_unique(array):
 
 
 def rename_rules(rules, names):
-    """Transform rules from integers to original symbolic values."""
+    """Transform rules from integers to original symbolic values (names are lists of values for every column).
+
+    RuleSet only keeps names, its rules are decoded when they are displayed or exported.
+    """
+    if isinstance(rules, RuleSet):
+        rules.names = names
+        return
     for rule in rules:
-        real_values = {}
-        for key, value in rule.descriptors.items():
-            real_values[key] = names[value]
-        rule.descriptors = real_values
-        rule.decision = names.get(rule.decision)
+        rename_rule(rule, names)
+
+
+def rename_rule(rule, names):
+    """Transform one rule from integers to original symbolic values and return it."""
+    real_values = {}
+    for key, value in rule.descriptors.items():
+        real_values[key] = names[key][value]
+    rule.descriptors = real_values
+    rule.decision = names[-1][rule.decision]
+    return rule
 
 
 def print_rules(rules):
@@ -296,6 +535,8 @@ def print_rules(rules):
 
 
 def get_scales(rules):
+    if isinstance(rules, RuleSet):
+        return rules.get_scales()
     scales = []
     for rule in rules:
         if rule.scale not in scales:
@@ -305,11 +546,17 @@ def get_scales(rules):
 
 
 def scale_rules(rules, scale):
+    if isinstance(rules, RuleSet):
+        for scale_rule in rules.get_scale_rules(scale):
+            yield scale_rule.print_rule()
+        return
     rules_scale = [rule for rule in rules if rule.scale == scale]
     for scale_rule in rules_scale:
         yield scale_rule.print_rule()
 
 
 def get_rule_scale_length(rules, scale):
+    if isinstance(rules, RuleSet):
+        return rules.get_scale_length(scale)
     rules_scale = [rule for rule in rules if rule.scale == scale]
     return rules_scale.__len__()
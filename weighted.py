@@ -0,0 +1,55 @@
+"""Collapsing of identical objects of decision system into weighted unique rows.
+
+Every unique object is kept once (in order of first appearance) with weight, the number of identical objects it
+stands for. BitsetIndex of WeightedSystem counts objects by weights, so algorithms run on unique rows and find the
+same rules with the same supports as on the whole system. Objects with the same attributes and other decisions are
+conflicts: system with conflicts is inconsistent, so they are reported before induction.
+"""
+
+
+class WeightedSystem(list):
+    """Unique objects (rows with decision) of decision system with weights and conflicting objects."""
+
+    def __init__(self, rows=(), weights=(), conflicts=(), original_size=None):
+        list.__init__(self, rows)
+        self.weights = list(weights)
+        self.conflicts = list(conflicts)  # (attributes values, {decision: number of objects})
+        self.original_size = original_size if original_size is not None else sum(self.weights)
+
+    def expand(self):
+        """Return list of rows with every unique row repeated weight times."""
+        return [list(row) for row, weight in zip(self, self.weights) for _ in range(weight)]
+
+    def get_report(self):
+        """Return dictionary with numbers of objects before and after deduplication and conflicts."""
+        return {'objects': self.original_size, 'unique': len(self), 'removed': self.original_size - len(self),
+                'shrink': len(self) / self.original_size if self.original_size else 1.0,
+                'conflicts': len(self.conflicts)}
+
+
+def deduplicate(decision_system):
+    """Return WeightedSystem of decision system (list of rows, decision is last)."""
+    positions = {}  # row -> position of unique row
+    rows = []
+    weights = []
+    decisions = {}  # attributes values -> {decision: number of objects}
+    for decision_object in decision_system:
+        key = tuple(decision_object)
+        position = positions.get(key)
+        if position is None:
+            positions[key] = len(rows)
+            rows.append(list(decision_object))
+            weights.append(1)
+        else:
+            weights[position] += 1
+        counts = decisions.setdefault(key[:-1], {})
+        counts[key[-1]] = counts.get(key[-1], 0) + 1
+
+    conflicts = [(values, counts) for values, counts in decisions.items() if len(counts) > 1]
+    return WeightedSystem(rows, weights, conflicts, len(decision_system))
+
+
+def format_report(report):
+    """Return one line description of report of WeightedSystem."""
+    return '{objects} objects -> {unique} unique rows ({removed} duplicates removed, {percent:.1f}% of input), ' \
+           '{conflicts} conflicts (same attributes, other decisions)'.format(percent=report['shrink'] * 100, **report)